@@ -1,4 +1,8 @@
 import unittest
+import json
+import os
+import random
+import tempfile
 
 from assignment1 import *
 
@@ -149,6 +153,402 @@ class Tests(TesterBase):
         for (results, roster, score, expected) in testList:
             with self.subTest(i=("results len %d" % len(results),roster, score)):
                 self.assertEqual(analyze(results, roster, score),expected)
+    def testIncrementalAnalyzer(self):
+        results = [['FFHBF', 'BGEED', 79], ['BBCEG', 'DFAGG', 52], ['AGDCD', 'CDBEC', 51], ['FCFFA', 'EECEF', 3],
+            ['EAAEE', 'GDECG', 89], ['CDFGG', 'ACAAD', 59], ['CAHFE', 'EDHGG', 45], ['BFGGE', 'BBBBE', 65],
+            ['CDGEB', 'GBEHC', 52], ['CHCAE', 'EEABH', 95], ['AEGHF', 'BFBBB', 46], ['CCHAA', 'GBGGH', 43],
+            ['BGBAE', 'EFFEH', 7], ['BDEHC', 'GDCEC', 78], ['FAECF', 'EDFHH', 42], ['DCDFH', 'FHEFA', 29],
+            ['FCDBG', 'ADEFH', 95], ['FEBBC', 'HAEHH', 43], ['AFEHA', 'HGFFH', 10], ['CEBBH', 'CFFBA', 75],
+            ['FFHBF', 'BGEED', 79], ['BBBBE', 'BFGGE', 35], ['AAAAA', 'AAAAA', 50]]
+        analyzer = IncrementalAnalyzer(8)
+        for i in range(0,len(results),5):
+            analyzer.ingestMany(results[i:i+5])
+            seen = results[:i+5]
+            for score in [0,35,50,51,90,100]:
+                with self.subTest(i=("results len %d" % len(seen),score)):
+                    expected = analyze([list(match) for match in seen],8,score)
+                    self.assertEqual(analyzer.query(score),expected)
+                    self.assertEqual(analyzer.top10(),expected[0])
+                    self.assertEqual(analyzer.matchesForScore(score),expected[1])
+        for team in ["ABI","AB1","ab"]:
+            with self.subTest(i=team):
+                with self.assertRaises(ValueError):
+                    analyzer.ingest([team,"AB",50])
+                self.assertEqual(analyzer.query(50),analyze([list(match) for match in results],8,50))
+        windowed = WindowedAnalyzer(2,1)
+        windowed.ingest(["AB","BA",60])
+        with self.assertRaises(ValueError):
+            windowed.ingest(["AC","BA",40])
+        self.assertEqual(windowed.query(60),analyze([["AB","BA",60]],2,60))
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testRadixSortResultsNumpy(self):
+        resultsList = [[['C', 'A', 54], ['T', 'E', 47], ['S', 'S', 83], ['R', 'C', 57], ['L', 'S', 13],
+                ['C', 'E', 53], ['L', 'F', 79], ['F', 'L', 91], ['C', 'A', 54], ['A', 'C', 54]],
+            [['AAB', 'BBA', 49], ['BAB', 'BAB', 42], ['AAA', 'AAA', 38], ['BAB', 'BAB', 36], ['BAB', 'BAB', 36],
+                ['ABA', 'BBA', 57], ['BBB', 'BBA', 32], ['BBA', 'BBB', 49], ['BBA', 'ABB', 55], ['AAB', 'AAA', 58]],
+            [['CBB', 'ACC', 0], ['AAB', 'DBC', 100], ['DDC', 'DAA', 100], ['ABD', 'DDB', 0]],
+            [["A","B",0]],
+            []]
+        for results in resultsList:
+            with self.subTest(i=("results len %d" % len(results))):
+                expected = radixSortResults([list(match) for match in results])
+                self.assertEqual(radixSortResults([list(match) for match in results],True),expected)
+                self.assertEqual(radixSortResultsNumpy(results),expected)
+    def testRadixSortResultsPacked(self):
+        resultsList = [([['C', 'A', 54], ['T', 'E', 47], ['S', 'S', 83], ['R', 'C', 57], ['L', 'S', 13],
+                ['C', 'E', 53], ['L', 'F', 79], ['F', 'L', 91], ['C', 'A', 54], ['A', 'C', 54]],20),
+            ([['AAB', 'BBA', 49], ['BAB', 'BAB', 42], ['AAA', 'AAA', 38], ['BAB', 'BAB', 36], ['BAB', 'BAB', 36],
+                ['ABA', 'BBA', 57], ['BBB', 'BBA', 32], ['BBA', 'BBB', 49], ['BBA', 'ABB', 55], ['AAB', 'AAA', 58]],2),
+            ([['CBB', 'ACC', 0], ['AAB', 'DBC', 100], ['DDC', 'DAA', 100], ['ABD', 'DDB', 0]],4),
+            ([["A","B",0]],3),
+            ([],1)]
+        for (results,roster) in resultsList:
+            with self.subTest(i=("results len %d" % len(results),roster)):
+                expected = radixSortResults([list(match) for match in results])
+                self.assertEqual(radixSortResultsPacked(results,roster),expected)
+        with self.assertRaises(ValueError):
+            radixSortResultsPacked([["A","D",50]],3)
+    def testAnalysisResultQueries(self):
+        results = [['CBB', 'ACC', 46], ['AAB', 'DBC', 72], ['DDC', 'DAA', 2], ['ABD', 'DDB', 67], ['ABD', 'BDD', 67]]
+        analysis = analyzeResults([list(match) for match in results],4)
+        self.assertEqual(len(analysis),8)
+        self.assertEqual(analysis.top10(),[['AAD', 'CDD', 98],['AAB', 'BCD', 72],['ABD', 'BDD', 67],['ACC', 'BBC', 54],
+            ['BBC', 'ACC', 46],['BDD', 'ABD', 33],['BCD', 'AAB', 28], ['CDD', 'AAD', 2]])
+        scores = [-5,0,2,3,46,50,98,99,100,101]
+        expected = [analyze([list(match) for match in results],4,score)[1] for score in scores]
+        self.assertEqual(analysis.matchesForScores(scores),expected)
+        for (lo,hi,output) in [(0,100,analysis.top10()),(30,70,[['ABD', 'BDD', 67],['ACC', 'BBC', 54],['BBC', 'ACC', 46],['BDD', 'ABD', 33]]),
+                (67,67,[['ABD', 'BDD', 67]]),(3,27,[]),(70,30,[]),(-10,2,[['CDD', 'AAD', 2]]),(98,150,[['AAD', 'CDD', 98]])]:
+            with self.subTest(i=(lo,hi)):
+                self.assertEqual(analysis.scoreRange(lo,hi),output)
+    def testTopK(self):
+        resultsList = [([['C', 'A', 54], ['T', 'E', 47], ['S', 'S', 83], ['R', 'C', 57], ['L', 'S', 13],
+                ['C', 'E', 53], ['L', 'F', 79], ['F', 'L', 91]],20),
+            ([['CBB', 'ACC', 50], ['AAB', 'DBC', 50], ['DDC', 'DAA', 50], ['ABD', 'DDB', 50]],4),
+            ([['AAA', 'AAA', 46], ['AAA', 'AAA', 72], ['AAA', 'AAA', 2], ['AAA', 'AAA', 67]],1),
+            ([["A","B",0]],3)]
+        for (results,roster) in resultsList:
+            copied = [list(match) for match in results]
+            expected = analyze([list(match) for match in results],roster,0)[0]
+            for k in [0,1,3,10]:
+                with self.subTest(i=("results len %d" % len(results),roster,k)):
+                    self.assertEqual(topK(copied,k,roster),expected[:k])
+            self.assertEqual(copied,results)
+        self.assertEqual(topK([['BA','CA',60],['AB','AC',60],['AB','AB',50]],3),[['AB','AC',60],['AB','AB',50],['AC','AB',40]])
+    def testAnalyzeFile(self):
+        results = [['FFHBF', 'BGEED', 79], ['BBCEG', 'DFAGG', 52], ['AGDCD', 'CDBEC', 51], ['FCFFA', 'EECEF', 3],
+            ['EAAEE', 'GDECG', 89], ['CDFGG', 'ACAAD', 59], ['CAHFE', 'EDHGG', 45], ['BFGGE', 'BBBBE', 65],
+            ['CDGEB', 'GBEHC', 52], ['CHCAE', 'EEABH', 95], ['AEGHF', 'BFBBB', 46], ['CCHAA', 'GBGGH', 43],
+            ['BGBAE', 'EFFEH', 7], ['BDEHC', 'GDCEC', 78], ['FAECF', 'EDFHH', 42], ['DCDFH', 'FHEFA', 29],
+            ['FCDBG', 'ADEFH', 95], ['FEBBC', 'HAEHH', 43], ['AFEHA', 'HGFFH', 10], ['CEBBH', 'CFFBA', 75],
+            ['FFHBF', 'BGEED', 79], ['BBBBE', 'BFGGE', 35]]
+        with tempfile.TemporaryDirectory() as directory:
+            csvPath = os.path.join(directory,"results.csv")
+            with open(csvPath,"w") as file:
+                file.write("team1,team2,score\n")
+                for (team1,team2,score) in results:
+                    file.write("%s,%s,%d\n" % (team1,team2,score))
+            jsonPath = os.path.join(directory,"results.jsonl")
+            with open(jsonPath,"w") as file:
+                for (team1,team2,score) in results:
+                    file.write(json.dumps({"team1":team1,"team2":team2,"score":score}) + "\n")
+            for path in [csvPath,jsonPath]:
+                for chunkSize in [1,4,100]:
+                    for score in [0,35,50,90,100]:
+                        with self.subTest(i=(os.path.basename(path),chunkSize,score)):
+                            expected = analyze([list(match) for match in results],8,score)
+                            self.assertEqual(analyzeFile(path,8,score,chunkSize,directory),expected)
+            # decimal scores are read and spilled exactly, with the inverse of the domain
+            decimal = ScoreDomain(1,decimals=2)
+            decimalResults = [[team1,team2,score / 100] for (team1,team2,score) in results]
+            with open(csvPath,"w") as file:
+                file.write("team1,team2,score\n")
+                for (team1,team2,score) in decimalResults:
+                    file.write("%s,%s,%s\n" % (team1,team2,score))
+            with open(jsonPath,"w") as file:
+                for match in decimalResults:
+                    file.write(json.dumps(match) + "\n")
+            for path in [csvPath,jsonPath]:
+                for score in [0,0.35,0.355,1]:
+                    with self.subTest(i=("decimal",os.path.basename(path),score)):
+                        self.assertEqual(analyzeFile(path,8,score,4,directory,decimal),analyze(decimalResults,8,score,domain=decimal))
+            with open(csvPath,"w") as file:
+                file.write("AB,BA,0.355\n")
+            with self.assertRaisesRegex(ValueError,"line 1 "):
+                analyzeFile(csvPath,2,0,4,directory,decimal)
+            # a header is only skipped on the first line, and malformed rows aren't dropped
+            badFiles = [("bad.csv","AB,BA,50\nAB,AA,35.5\n"),("bad.csv","AB,BA,50\n\nBB,AA,-3\n"),
+                ("bad.csv","AB,BA,50\nAB,BA\n"),("bad.csv","AB,BA,50\nteam1,team2,score\n"),
+                ("bad.jsonl","[\"AB\",\"BA\",50]\n[\"AB\",\"BA\",35.5]\n"),("bad.jsonl","[\"AB\",\"BA\",50]\n{\"team1\":\"AB\"}\n"),
+                ("bad.jsonl","[\"AB\",\"BA\",50]\n[\"AB\",\"BA\",50\n")]
+            for (name,text) in badFiles:
+                path = os.path.join(directory,name)
+                with open(path,"w") as file:
+                    file.write(text)
+                with self.subTest(i=text):
+                    with self.assertRaisesRegex(ValueError,"line [23] "):
+                        analyzeFile(path,2,50,1,directory)
+    def testAnalysisDoesNotModifyResults(self):
+        results = [['CBB', 'ACC', 46], ['AAB', 'DBC', 72], ['DDC', 'DAA', 2], ['ABD', 'DDB', 67], ('CBB', 'ACC', 46)]
+        copied = [list(match) for match in results[:-1]] + [results[-1]]
+        columns = ResultsColumns(results)
+        self.assertEqual(len(columns),10)
+        self.assertEqual(columns.row(1),['AAB', 'BCD', 72])
+        self.assertEqual(columns.row(6),['BCD', 'AAB', 28])
+        self.assertEqual(analyze(results,4,50),[[['AAD', 'CDD', 98],['AAB', 'BCD', 72],['ABD', 'BDD', 67],['ACC', 'BBC', 54],
+            ['BBC', 'ACC', 46],['BDD', 'ABD', 33],['BCD', 'AAB', 28], ['CDD', 'AAD', 2]],[['ACC', 'BBC', 54]]])
+        self.assertEqual(results,copied)
+    def testAnalyzeParallel(self):
+        results = [['FFHBF', 'BGEED', 79], ['BBCEG', 'DFAGG', 52], ['AGDCD', 'CDBEC', 51], ['FCFFA', 'EECEF', 3],
+            ['EAAEE', 'GDECG', 89], ['CDFGG', 'ACAAD', 59], ['CAHFE', 'EDHGG', 45], ['BFGGE', 'BBBBE', 65],
+            ['CDGEB', 'GBEHC', 52], ['CHCAE', 'EEABH', 95], ['AEGHF', 'BFBBB', 46], ['CCHAA', 'GBGGH', 43],
+            ['BGBAE', 'EFFEH', 7], ['BDEHC', 'GDCEC', 78], ['FAECF', 'EDFHH', 42], ['DCDFH', 'FHEFA', 29],
+            ['FCDBG', 'ADEFH', 95], ['FEBBC', 'HAEHH', 43], ['AFEHA', 'HGFFH', 10], ['CEBBH', 'CFFBA', 75],
+            ['FFHBF', 'BGEED', 79], ['BBBBE', 'BFGGE', 35], ['BBCEG', 'DFAGG', 48]]
+        for processes in [1,2,3]:
+            for score in [0,35,48,90,100]:
+                with self.subTest(i=(processes,score)):
+                    expected = analyze(results,8,score)
+                    self.assertEqual(analyzeParallel(results,8,score,processes),expected)
+                    self.assertEqual(analyze(results,8,score,processes),expected)
+    def testTeamDictionaryEncoding(self):
+        results = [['CBB', 'ACC', 46], ['BCB', 'CCA', 72], ['CBB', 'ACC', 2], ['BBC', 'CAC', 67], ['CBB', 'BCB', 30]]
+        columns = ResultsColumns(results)
+        self.assertEqual(columns.teamNames,['BBC','ACC'])
+        # each distinct team of a block is looked up once, and the 6 misses are ordered in one bulk call
+        self.assertEqual((columns.rawTeamIds.misses,columns.rawTeamIds.hits),(6,0))
+        # the second block of 5 matches finds every team except CBB (the least recently used) in the cache
+        repeatedColumns = ResultsColumns(results + results,5)
+        self.assertEqual((repeatedColumns.rawTeamIds.misses,repeatedColumns.rawTeamIds.hits),(7,5))
+        self.assertEqual([repeatedColumns.row(i) for i in range(5)],[columns.row(i) for i in range(5)])
+        smallColumns = ResultsColumns(results,1)
+        self.assertEqual(len(smallColumns.rawTeamIds),1)
+        self.assertEqual(smallColumns.teamNames,columns.teamNames)
+        self.assertEqual([smallColumns.row(i) for i in range(10)],[columns.row(i) for i in range(10)])
+        cache = LRUCache(2)
+        cache.put("A",1); cache.put("B",2); cache.get("A"); cache.put("C",3)
+        self.assertEqual((cache.get("A"),cache.get("B"),cache.get("C")),(1,None,3))
+    def testAnalysisWithCounts(self):
+        results = [['CBB', 'ACC', 46], ['AAB', 'DBC', 72], ['CBB', 'CAC', 46], ['ABD', 'DDB', 67], ['BBC', 'ACC', 46],
+            ['ACC', 'BBC', 54], ['BCD', 'AAB', 28], ['ABD', 'BDD', 67]]
+        expected = [[['AAB', 'BCD', 72, 2],['ABD', 'BDD', 67, 2],['ACC', 'BBC', 54, 4],['BBC', 'ACC', 46, 4],
+            ['BDD', 'ABD', 33, 2],['BCD', 'AAB', 28, 2]],[['ACC', 'BBC', 54, 4]]]
+        for processes in [1,2,3]:
+            with self.subTest(i=processes):
+                self.assertEqual(analyze(results,4,50,processes,True),expected)
+        analysis = analyzeResults(results,4)
+        self.assertEqual(analysis.scoreRange(40,60,True),[['ACC', 'BBC', 54, 4],['BBC', 'ACC', 46, 4]])
+        self.assertEqual(analysis.matchesForScore(50),[['ACC', 'BBC', 54]])
+        self.assertEqual(sum(analysis.counts),2*len(results))
+    def testRadixSortEngine(self):
+        edges = [(3,1,250),(0,2,-7),(3,0,250),(1,1,70000),(0,2,5),(2,3,-7),(1,0,250)]
+        keySpecs = [([SortKey(lambda x:x[2],"int")],lambda x:x[2],False),
+            ([SortKey(lambda x:x[2],"int",True)],lambda x:x[2],True),
+            ([SortKey(lambda x:x[0],"int",minValue=0,maxValue=3),SortKey(lambda x:x[2],"int",True)],lambda x:(x[0],-x[2]),False),
+            ([SortKey(lambda x:x[2],"int",minValue=-10,maxValue=1 << 20),SortKey(lambda x:x[1],"int",True)],lambda x:(x[2],-x[1]),False)]
+        for (keySpec,key,reverse) in keySpecs:
+            with self.subTest(i=[(sortKey.keyType,sortKey.descending) for sortKey in keySpec]):
+                self.assertEqual(radixSort(edges,keySpec),sorted(edges,key=key,reverse=reverse))
+        names = ["bob","Al","alice","bo","","alice","b0b"]
+        self.assertEqual(radixSort(names,[SortKey(lambda x:x,"string")]),sorted(names))
+        self.assertEqual(radixSort(names,[SortKey(lambda x:x,"string",True)]),sorted(names,reverse=True))
+        schedule = [("TUE",9),("MON",17),("MON",9),("WED",12),("TUE",8)]
+        self.assertEqual(radixSort(schedule,[SortKey(lambda x:x[0],"alpha",alphabet="DEMNOTUW"),SortKey(lambda x:x[1],"int")]),
+            [("MON",9),("MON",17),("TUE",8),("TUE",9),("WED",12)])
+        self.assertEqual(list(radixSortOrder([],[SortKey(lambda x:x,"int")])),[])
+        results = [['AB', 'B', 30], ['A', 'BAA', 30], ['AB', 'BA', 30], ['C', 'AB', 70], ['A', 'B', 30]]
+        self.assertEqual(radixSortResults(results),[['AB', 'BA', 30], ['AB', 'B', 30], ['A', 'BAA', 30], ['A', 'B', 30], ['C', 'AB', 70]])
+    def testRadixSortResultsMSD(self):
+        resultsList = [[['AB', 'B', 30], ['A', 'BAA', 30], ['AB', 'BA', 30], ['C', 'AB', 70], ['A', 'B', 30], ['AB', 'BA', 30]],
+            [['AAAAAAAAAAAAAAAAAAAAZ', 'B', 50], ['AAAAAAAAAAAAAAAAAAAAY', 'C', 50], ['AAAAAAAAAAAAAAAAAAAAZ', 'A', 50],
+                ['C', 'AAAAAAAAAAAAAAAAAAAA', 50], ['C', 'AAAAAAAAAAAAAAAAAAA', 50], ['B', 'A', 49]] * 3,
+            [['FFHBF', 'BGEED', 79], ['BBCEG', 'DFAGG', 52], ['AGDCD', 'CDBEC', 51], ['FCFFA', 'EECEF', 3],
+                ['EAAEE', 'GDECG', 89], ['CDFGG', 'ACAAD', 59], ['CAHFE', 'EDHGG', 45], ['BFGGE', 'BBBBE', 65]] * 4,
+            []]
+        for results in resultsList:
+            expected = radixSortResults(results)
+            for cutoff in [0,1,4,16]:
+                with self.subTest(i=("results len %d" % len(results),cutoff)):
+                    self.assertEqual(radixSortResultsMSD(results,cutoff),expected)
+            self.assertEqual(radixSortResults(results,mode="msd"),expected)
+    def testResultsIndex(self):
+        results = [['CBB', 'ACC', 46], ['AAB', 'DBC', 72], ['DDC', 'DAA', 2], ['ABD', 'DDB', 67], ['CBB', 'ACC', 46]]
+        newResults = [['ABD', 'DDB', 67], ['AAA', 'DDD', 50], ['DDC', 'DAA', 99], ['BBB', 'CCC', 10]]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory,"results.idx")
+            index = buildResultsIndex(results,4,path)
+            self.assertEqual(len(index),8)
+            for score in [0,46,50,100]:
+                with self.subTest(i=("index",score)):
+                    self.assertEqual([index.top10(),index.matchesForScore(score)],analyze(results,4,score))
+                    self.assertEqual([index.top10(True),index.matchesForScore(score,True)],analyze(results,4,score,1,True))
+            index.appendMatches(newResults[:2])
+            index.appendMatches(newResults[2:])
+            for score in [0,46,50,100]:
+                with self.subTest(i=("delta",score)):
+                    self.assertEqual([index.top10(True),index.matchesForScore(score,True)],analyze(results + newResults,4,score,1,True))
+            self.assertEqual(index.scoreRange(40,60,True),analyzeResults(results + newResults,4).scoreRange(40,60,True))
+            for score in [101,50.5]:
+                with self.assertRaises(ValueError):
+                    index.appendMatches([['AAA','BBB',10],['AAA','BBB',score]])
+            index.compact()
+            self.assertFalse(os.path.exists(path + ".delta"))
+            reopened = ResultsIndex(path)
+            for score in [0,46,50,100]:
+                with self.subTest(i=("compacted",score)):
+                    expected = analyze(results + newResults,4,score,1,True)
+                    self.assertEqual([index.top10(True),index.matchesForScore(score,True)],expected)
+                    self.assertEqual([reopened.top10(True),reopened.matchesForScore(score,True)],expected)
+            index.close()
+            reopened.close()
+            # a compact that stopped after moving the delta file aside, before or after replacing the index file
+            for replaced in [False,True]:
+                buildResultsIndex(results,4,path).close()
+                with open(path + ".delta","w") as file:
+                    file.write("".join("%s,%s,%d\n" % tuple(match) for match in newResults))
+                writeResultsIndex(path + ".tmp",analyzeResults(results + newResults,4),4)
+                os.replace(path + ".delta",path + ".compacting")
+                if(replaced):
+                    os.replace(path + ".tmp",path)
+                recovered = ResultsIndex(path)
+                self.assertFalse(os.path.exists(path + ".compacting"))
+                for score in [0,46,50,100]:
+                    with self.subTest(i=("recovered",replaced,score)):
+                        expected = analyze(results + newResults,4,score,1,True)
+                        self.assertEqual([recovered.top10(True),recovered.matchesForScore(score,True)],expected)
+                recovered.close()
+    def testTeamLeaderboards(self):
+        results = [['CBB', 'ACC', 46], ['AAB', 'DBC', 72], ['DDC', 'DAA', 2], ['ABD', 'DDB', 67], ['CBB', 'ACC', 46],
+            ['BBC', 'BCD', 80], ['CBB', 'CCA', 20], ['BBC', 'AAB', 46]]
+        analysis = analyzeResults(results,4)
+        self.assertEqual(analysis.teamTop("CBB"),[['BBC', 'BCD', 80],['BBC', 'AAB', 46],['BBC', 'ACC', 46],['BBC', 'ACC', 20]])
+        self.assertEqual(analysis.teamTop("BCB",2,True),[['BBC', 'BCD', 80, 1],['BBC', 'AAB', 46, 1]])
+        self.assertEqual(analysis.teamTop("ABC"),[])
+        self.assertEqual(analysis.headToHead("BBC","CCA",True),[['BBC', 'ACC', 46, 2],['BBC', 'ACC', 20, 1]])
+        self.assertEqual(analysis.headToHead("ACC","CBB"),[['ACC', 'BBC', 80],['ACC', 'BBC', 54]])
+        self.assertEqual(analysis.headToHead("ACC","AAB"),[])
+        for team in ["AAB","ACC","BCD","CDD"]:
+            with self.subTest(i=team):
+                expected = [match for match in analysis.scoreRange(0,100) if match[0]==team]
+                self.assertEqual(analysis.teamTop(team,None),expected)
+    def testWindowedAnalyzer(self):
+        results = [['CBB', 'ACC', 46], ['AAB', 'DBC', 72], ['CBB', 'ACC', 46], ['DDC', 'DAA', 2], ['ABD', 'DDB', 67],
+            ['BCB', 'CCA', 46], ['BBC', 'BCD', 80], ['CBB', 'CCA', 20], ['BBC', 'AAB', 46], ['AAA', 'AAA', 50]]
+        for windowSize in [1,3,4]:
+            analyzer = WindowedAnalyzer(4,windowSize)
+            for i in range(len(results)):
+                analyzer.ingest(results[i])
+                window = results[max(0,i+1-windowSize):i+1]
+                for score in [0,46,60]:
+                    with self.subTest(i=(windowSize,i,score)):
+                        self.assertEqual(analyzer.query(score),analyze(window,4,score))
+        days = [1,1,2,4,4,5,7,8,8,12]
+        analyzer = WindowedAnalyzer(4,windowTime=3)
+        for i in range(len(results)):
+            analyzer.ingest(results[i],days[i])
+            window = [results[j] for j in range(i+1) if days[j]>days[i]-3]
+            with self.subTest(i=("days",i)):
+                self.assertEqual(analyzer.query(46),analyze(window,4,46))
+        analyzer.expire(100)
+        self.assertEqual((len(analyzer),analyzer.query(0)),(0,[[],[]]))
+        analyzer = WindowedAnalyzer(2,windowTime=10)
+        with self.assertRaises(ValueError):
+            analyzer.ingest(['AA','BB',60])
+        analyzer.ingest(['AB','BA',40],timestamp=100)
+        self.assertEqual(analyzer.query(40),analyze([['AB','BA',40]],2,40))
+    def testAlphabeticalOrderBulk(self):
+        teamsList = [(["CBB","ACC","AAB","DBC","DDC","DAA","ABD","DDB","BCB"],4),
+            (["FFHBF","BGEED","","H","GAGAGAGAGAGAGAGAGAGA","FCDBG","A"],8),
+            (["ZYXWVUTSRQPONMLKJIHGFEDCBA","Q","QQQ",""],26),
+            ([],1)]
+        for (teams,roster) in teamsList:
+            with self.subTest(i=(len(teams),roster)):
+                self.assertEqual(alphabeticalOrderBulk(teams,roster),[alphabeticalOrder(team) for team in teams])
+    def testScoreDomains(self):
+        def expectedAnalysis(results,score,inverse):
+            unique = set()
+            for (team1,team2,s) in results:
+                unique.add((alphabeticalOrder(team1),alphabeticalOrder(team2),s))
+                unique.add((alphabeticalOrder(team2),alphabeticalOrder(team1),inverse(s)))
+            top10matches = [list(match) for match in sorted(unique,key=lambda x:(-x[2],x[0],x[1]))[:10]]
+            found = [match[2] for match in unique if match[2]>=score]
+            searchedMatches = [] if len(found)==0 else [list(match) for match in sorted(unique) if match[2]==min(found)]
+            return [top10matches,searchedMatches]
+        rng = random.Random(17)
+        def randomTeam(length,roster):
+            return "".join(chr(ord("A") + rng.randrange(roster)) for _ in range(length))
+        wide = ScoreDomain(50000)
+        results = [[randomTeam(3,4),randomTeam(3,4),rng.randint(0,50000)] for _ in range(300)]
+        for score in [-1,0,12345,25000,49999,50000,50001]:
+            with self.subTest(i=("wide",score)):
+                self.assertEqual(analyze(results,4,score,domain=wide),expectedAnalysis(results,score,lambda s:50000-s))
+        with self.subTest(i="wide sort"):
+            self.assertEqual(radixSortResults(results,domain=wide),radixSortResults(results,mode="msd",domain=wide))
+            self.assertEqual(radixSortResults(results,domain=wide),radixSortResultsPacked(results,4,wide))
+        with self.subTest(i="wide parallel"):
+            self.assertEqual(analyze(results,4,25000,2,True,wide),analyze(results,4,25000,1,True,wide))
+        with self.subTest(i="wide topK"):
+            self.assertEqual(topK(results,25,4,wide),analyzeResults(results,4,wide).scoreRange(0,50000)[:25])
+        incremental = IncrementalAnalyzer(4,wide)
+        windowed = WindowedAnalyzer(4,50,domain=wide)
+        for i in range(len(results)):
+            incremental.ingest(results[i])
+            windowed.ingest(results[i])
+        for score in [0,25000,50001]:
+            with self.subTest(i=("wide incremental",score)):
+                self.assertEqual(incremental.query(score),analyze(results,4,score,domain=wide))
+                self.assertEqual(windowed.query(score),analyze(results[-50:],4,score,domain=wide))
+        # a wide domain is searched, and a domain with no more keys than there are matches has a score table
+        analysis = analyzeResults(results,4,wide)
+        self.assertEqual(analysis.scoreStart,None)
+        self.assertEqual(analysis.scoreRange(10000,20000),[match for match in analysis.scoreRange(0,50000) if 10000<=match[2]<=20000])
+        results = [[randomTeam(3,4),randomTeam(3,4),rng.randint(0,500)] for _ in range(300)]
+        analysis = analyzeResults(results,4,ScoreDomain(500))
+        self.assertNotEqual(analysis.scoreStart,None)
+        self.assertEqual(analysis.scoreRange(-5,200),[match for match in analysis.scoreRange(0,500) if match[2]<=200])
+        for score in [-1,0,250,499,500,501]:
+            with self.subTest(i=("table",score)):
+                self.assertEqual(analyze(results,4,score,domain=ScoreDomain(500)),expectedAnalysis(results,score,lambda s:500-s))
+        decimal = ScoreDomain(1,decimals=2)
+        results = [[randomTeam(2,3),randomTeam(2,3),rng.randint(0,100) / 100] for _ in range(100)]
+        for score in [0,0.005,0.5,0.99,1]:
+            with self.subTest(i=("decimal",score)):
+                self.assertEqual(analyze(results,3,score,domain=decimal),expectedAnalysis(results,score,lambda s:round(1-s,2)))
+        analysis = analyzeResults(results,3,decimal)
+        self.assertEqual(analysis.scoreRange(0.25,0.5),[match for match in analysis.scoreRange(0,1) if 0.25<=match[2]<=0.5])
+        windowed = WindowedAnalyzer(3,20,domain=decimal)
+        windowed.ingestMany(results)
+        self.assertEqual(windowed.query(0.5),analyze(results[-20:],3,0.5,domain=decimal))
+        self.assertEqual(topK(results,10,3,decimal),analyze(results,3,0,domain=decimal)[0])
+        # goals scored by team1 and team2 as 10 * team1 goals + team2 goals, so the inverse swaps the digits
+        def swapGoals(score):
+            return score % 10 * 10 + score // 10
+        results = [[randomTeam(2,3),randomTeam(2,3),rng.randint(0,9) * 10 + rng.randint(0,9)] for _ in range(100)]
+        for score in [0,33,60,99]:
+            with self.subTest(i=("inverse",score)):
+                self.assertEqual(analyze(results,3,score,domain=ScoreDomain(99,swapGoals)),expectedAnalysis(results,score,swapGoals))
+        # points out of 20, where the inverse of a score is 20 - score
+        results = [[randomTeam(2,3),randomTeam(2,3),rng.randint(0,20)] for _ in range(50)]
+        for score in [0,7,10,19,20,21]:
+            with self.subTest(i=("20 points",score)):
+                self.assertEqual(analyze(results,3,score,domain=ScoreDomain(20)),expectedAnalysis(results,score,lambda s:20-s))
+        with self.assertRaises(ValueError):
+            analyze([["AB","BA",21]],2,10,domain=ScoreDomain(20))
+        with self.assertRaises(ValueError):
+            analyze([["AB","BA",101]],2,50)
+    def testAnalyzeBatch(self):
+        jobs = [([['CBB', 'ACC', 46], ['AAB', 'DBC', 72], ['CBB', 'ACC', 46], ['DDC', 'DAA', 2]],4,46),
+            ([],2,50),
+            ([['AB', 'BA', 50], ['BB', 'AA', 0], ['AB', 'AB', 100]],2,0),
+            ([['ABD', 'DDB', 67], ['BCB', 'CCA', 46], ['BBC', 'BCD', 80], ['CBB', 'CCA', 20], ['BBC', 'AAB', 46]],4,81),
+            ([['ZYX', 'AAA', 99], ['ZYX', 'AAA', 99]],26,99)]
+        for withCounts in [False,True]:
+            output = analyzeBatch(jobs,withCounts)
+            for league in range(len(jobs)):
+                (results,roster,score) = jobs[league]
+                with self.subTest(i=(league,withCounts)):
+                    self.assertEqual(output[league],analyze(results,roster,score,withCounts=withCounts))
+        self.assertEqual(analyzeBatch([]),[])
     
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
@@ -1,3 +1,7 @@
+import os
+import random
+import tempfile
+import threading
 import unittest
 
 from assignment2 import *
@@ -93,6 +97,240 @@ class Tests(TesterBase):
         start = 0
         finish = 7 
         self.assertEqual(optimalRoute(downhillScores,start,finish),[0,2,3,4,5,1,6,7])
+    # ----------------------------------------------------------------------------------------------
+    def testCSRGraph(self):
+        roads = [(0,1,4),(1,2,2),(2,3,3),(3,4,1),(1,5,2),
+            (5,6,5),(6,3,2),(6,4,3),(1,7,4),(7,8,2),
+            (8,7,2),(7,3,2),(8,0,11),(4,3,1),(4,8,10)]
+        cafes = [(5,10),(6,1),(7,5),(0,3),(8,4)]
+        g = RoadGraph(roads,cafes)
+        csr = g.getCSR()
+        self.assertEqual(list(csr.offsets),[0,1,4,5,6,8,9,11,13,15])
+        self.assertEqual(list(csr.targets[csr.offsets[1]:csr.offsets[2]]),[2,5,7])
+        self.assertEqual(list(csr.oppTargets[csr.oppOffsets[3]:csr.oppOffsets[4]]),[2,6,7,4])
+        self.assertEqual(list(csr.oppWeights[csr.oppOffsets[3]:csr.oppOffsets[4]]),[3,2,2,1])
+        # the edges are only kept by the CSRGraph once it has been built
+        self.assertEqual((g.vertexes,len(g.edgeU),len(csr),g.edgeCount),(None,0,15,15))
+        full = RoadGraph(roads,cafes,compact=False)
+        self.assertEqual([edge.v.id for edge in full.vertexes[1].edges],[2,5,7])
+        for start in range(len(g)):
+            for end in range(len(g)):
+                with self.subTest(i=(start,end)):
+                    self.assertEqual(g.routing(start,end),full.routing(start,end))
+        # adding an edge rebuilds the grouped edges
+        g.addEdgeByIndex(3,7,0.5)
+        self.assertEqual(g.routing(3,4),[3,7,3,4])
+        csr = g.getCSR()
+        self.assertEqual(csr.weights.typecode,"d")
+        # the added edge goes after the existing edges of both of its vertexes
+        self.assertEqual(list(csr.targets[csr.offsets[3]:csr.offsets[4]]),[4,7])
+        self.assertEqual(list(csr.oppTargets[csr.oppOffsets[7]:csr.oppOffsets[8]]),[1,8,3])
+        self.assertEqual((len(g.edgeU),len(csr)),(0,16))
+        with self.assertRaises(IndexError):
+            g.addEdgeByIndex(0,len(g))
+        state = g.djikstra(0)
+        self.assertEqual((state.distOf(4),state.prevOf(4)),(10,3))
+
+    def testQueryScopedState(self):
+        roads = [(0,1,4),(1,2,2),(2,3,3),(3,4,1),(1,5,2),
+            (5,6,5),(6,3,2),(6,4,3),(1,7,4),(7,8,2),
+            (8,7,2),(7,3,2),(8,0,11),(4,3,1),(4,8,10),(9,9,1)]
+        cafes = [(5,10),(6,1),(7,5),(0,3),(8,4)]
+        g = RoadGraph(roads,cafes)
+        pairs = [(start,end) for start in range(len(g)) for end in range(len(g))]
+        expected = [g.routing(start,end) for (start,end) in pairs]
+        # the same states are reused by every query of a thread
+        states = g.getDjikStates()
+        self.assertEqual([g.routing(start,end) for (start,end) in pairs],expected)
+        self.assertIs(g.getDjikStates()[0],states[0])
+        self.assertEqual(g.routing(9,0),None)
+        self.assertEqual(g.routing(0,0),[0])
+        self.assertEqual((states[0].distOf(9),states[0].prevOf(9)),(float('inf'),None))
+        # queries from other threads don't interfere with each other
+        outputs = [None] * 4
+        def worker(index):
+            outputs[index] = [g.routing(start,end) for (start,end) in pairs]
+        threads = [threading.Thread(target=worker,args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for i in range(4):
+            with self.subTest(i=i):
+                self.assertEqual(outputs[i],expected)
+
+    def testRoutingMany(self):
+        roads = [
+            (0,1,1),(0,5,9),(0,11,2),
+            (1,2,1),(1,3,1),
+            (2,6,8),
+            (4,10,1),
+            (5,0,1),(5,4,1),(5,6,3),
+            (6,5,1),(6,7,10),
+            (7,5,1),
+            (8,7,4),(8,9,1),(8,10,1),
+            (9,8,1),
+            (10,5,10),(10,8,1),
+            (11,4,1),(12,12,1)
+        ]
+        cafes = [(3,1),(5,20),(6,4),(9,2),(11,1)]
+        pairs = [(7,1),(1,7),(8,10),(1,1),(0,0),(6,6),(5,5),(9,3),(7,1),(12,3),(3,12),(1,8),(7,8)]
+        for compact in [False,True]:
+            g = RoadGraph(roads,cafes,compact)
+            expected = [g.routing(start,end) for (start,end) in pairs]
+            self.assertEqual(expected[:8],[[7,5,6,5,0,1],[1,2,6,5,4,10,8,7],[8,9,8,10],[1,2,6,5,0,1],
+                [0,11,4,10,8,7,5,0],[6],[5,6,5],[9,8,7,5,0,1,3]])
+            for (workers,useProcesses) in [(1,False),(3,False),(2,True)]:
+                with self.subTest(i=(compact,workers,useProcesses)):
+                    self.assertEqual(g.routingMany(pairs,workers,useProcesses),expected)
+        self.assertEqual(g.routingMany([]),[])
+        self.assertEqual(RoadGraph(roads,[]).routingMany([(0,1)]),[None])
+        # a graph with equally quick paths, where the cafe tables and contraction hierarchy return different paths to djikstra
+        roads = [(5,4,1),(3,0,1),(6,0,1),(5,2,1),(0,4,1),(5,5,1),(2,2,2),(2,1,1),(1,3,2),(4,1,2),(4,2,1),(0,5,1),(5,2,2),(6,6,1)]
+        cafes = [(0,0),(2,2)]
+        pairs = [(start,end) for start in range(7) for end in range(7)]
+        plain = RoadGraph(roads,cafes).routingMany(pairs)
+        for engine in ["tables","hierarchy"]:
+            g = RoadGraph(roads,cafes)
+            if(engine=="tables"):
+                g.precomputeCafeTables()
+            else:
+                g.buildContractionHierarchy()
+            expected = [g.routing(start,end) for (start,end) in pairs]
+            with self.subTest(i=engine):
+                self.assertNotEqual(expected,plain)
+                self.assertEqual(g.routingMany(pairs),expected)
+                self.assertEqual(g.routingMany(pairs,3),expected)
+
+    def testTreeCache(self):
+        roads = [(0,1,4),(1,2,2),(2,3,3),(3,4,1),(1,5,2),
+            (5,6,5),(6,3,2),(6,4,3),(1,7,4),(7,8,2),
+            (8,7,2),(7,3,2),(8,0,11),(4,3,1),(4,8,10)]
+        cafes = [(5,10),(6,1),(7,5),(0,3),(8,4)]
+        g = RoadGraph(roads,cafes)
+        treeBytes = 16 * len(g)
+        cache = g.enableTreeCache(3 * treeBytes)
+        routingInputList = [(1,7),(7,8),(1,3),(1,4),(3,4),(1,7)]
+        expectedOutputList = [[1,7],[7, 8],[1, 5, 6, 3],[1, 5, 6, 4],[3, 4, 8, 7, 3, 4],[1,7]]
+        for i in range(len(routingInputList)):
+            with self.subTest(i=routingInputList[i]):
+                self.assertEqual(g.routing(*routingInputList[i]),expectedOutputList[i])
+        # the tree from 1 is reused twice and the reverse tree from 4 once, and only the 3 most recent trees are kept
+        self.assertEqual(cache.stats(),{"hits":3,"misses":9,"trees":3,"bytes":3 * treeBytes})
+        self.assertEqual(list(cache.trees),[(4,True),(1,False),(7,True)])
+        # adding a road clears the cache
+        g.addEdgeByIndex(3,7,0)
+        self.assertEqual(g.routing(3,4),[3,7,3,4])
+        self.assertEqual(cache.stats(),{"hits":3,"misses":11,"trees":2,"bytes":2 * treeBytes})
+        tree = g.getTree(3)
+        self.assertEqual((tree.distOf(4),tree.prevOf(4),tree.prevOf(3),tree.isDiscovered(0)),(1,3,None,True))
+        self.assertEqual(cache.stats()["hits"],4)
+
+    def testLayeredRouting(self):
+        graphList = [([(0,1,4),(1,2,2),(2,3,3),(3,4,1),(1,5,2),
+                (5,6,5),(6,3,2),(6,4,3),(1,7,4),(7,8,2),
+                (8,7,2),(7,3,2),(8,0,11),(4,3,1),(4,8,10)],
+                [(5,10),(6,1),(7,5),(0,3),(8,4)]),
+            ([(0,1,1),(0,5,9),(0,11,2),(1,2,1),(1,3,1),(2,6,8),(4,10,1),(5,0,1),(5,4,1),(5,6,3),
+                (6,5,1),(6,7,10),(7,5,1),(8,7,4),(8,9,1),(8,10,1),(9,8,1),(10,5,10),(10,8,1),(11,4,1),(12,12,1)],
+                [(3,1),(5,20),(6,4),(9,2),(11,1)])]
+        for (roads,cafes) in graphList:
+            g = RoadGraph(roads,cafes)
+            for start in range(len(g)):
+                for end in range(len(g)):
+                    with self.subTest(i=(len(g),start,end)):
+                        self.assertEqual(g.layeredRouting(start,end),g.routing(start,end))
+        # a cafe with the same vertex as the start and end, and a quicker cafe that is listed later
+        g = RoadGraph([(0,1,1),(1,0,1)],[(0,5),(1,2),(1,1)])
+        self.assertEqual(g.layeredRouting(0,0),[0,1,0])
+        self.assertEqual(g.layeredRouting(1,1),[1])
+        self.assertEqual(RoadGraph([(0,1,1)],[]).layeredRouting(0,1),None)
+        # random graphs with many equally quick paths and cafes
+        rng = random.Random(2004)
+        for n in range(20):
+            vertexCount = rng.randint(1,12)
+            roads = [(rng.randrange(vertexCount),rng.randrange(vertexCount),rng.randint(0,3)) for _ in range(rng.randint(0,30))]
+            roads.append((vertexCount-1,vertexCount-1,1)) # so that every vertex is in the graph
+            cafes = [(rng.randrange(vertexCount),rng.randint(0,3)) for _ in range(rng.randint(1,5))]
+            g = RoadGraph(roads,cafes)
+            for start in range(len(g)):
+                for end in range(len(g)):
+                    with self.subTest(i=("random",n,start,end)):
+                        self.assertEqual(g.layeredRouting(start,end),g.routing(start,end))
+
+    def testCafeTables(self):
+        roads = [(0,1,1),(0,5,9),(0,11,2),(1,2,1),(1,3,1),(2,6,8),(4,10,1),(5,0,1),(5,4,1),(5,6,3),
+            (6,5,1),(6,7,10),(7,5,1),(8,7,4),(8,9,1),(8,10,1),(9,8,1),(10,5,10),(10,8,1),(11,4,1),(12,12,1)]
+        cafes = [(3,1),(5,20),(6,4),(9,2),(11,1)]
+        g = RoadGraph(roads,cafes)
+        expected = [[g.routing(start,end) for end in range(len(g))] for start in range(len(g))]
+        tables = g.precomputeCafeTables()
+        self.assertEqual(tables.cafes,[3,5,6,9,11])
+        for start in range(len(g)):
+            with self.subTest(i=start):
+                self.assertEqual([g.routing(start,end) for end in range(len(g))],expected[start])
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = os.path.join(tempDir,"cafes.bin")
+            g.saveCafeTables(path)
+            loaded = RoadGraph(roads,cafes)
+            loaded.loadCafeTables(path)
+            for cafe in tables.cafes:
+                with self.subTest(i=("loaded",cafe)):
+                    self.assertEqual(loaded.cafeTables.toCafe[cafe].dist,tables.toCafe[cafe].dist)
+                    self.assertEqual(loaded.cafeTables.fromCafe[cafe].prev,tables.fromCafe[cafe].prev)
+            self.assertEqual(loaded.routing(7,1),[7,5,6,5,0,1])
+            with self.assertRaises(ValueError):
+                RoadGraph(roads[:-2],cafes).loadCafeTables(path)
+            with self.assertRaises(ValueError):
+                RoadGraph(roads,cafes[1:]).loadCafeTables(path)
+            # a graph with the same shape but different times can't use the tables
+            path = os.path.join(tempDir,"swapped.bin")
+            swapped = RoadGraph([(0,1,1),(1,3,1),(0,2,5),(2,3,5)],[(1,0),(2,0)])
+            swapped.precomputeCafeTables()
+            swapped.saveCafeTables(path)
+            swapped = RoadGraph([(0,1,5),(1,3,5),(0,2,1),(2,3,1)],[(1,0),(2,0)])
+            with self.assertRaises(ValueError):
+                swapped.loadCafeTables(path)
+            self.assertEqual(swapped.routing(0,3),[0,2,3])
+        # the tables are only used while the roads and cafes stay the same
+        g.cafeList = [(12,0)]
+        self.assertEqual(g.getCafeTables(),None)
+        self.assertEqual(g.routing(12,12),[12])
+        g.precomputeCafeTables()
+        g.addEdgeByIndex(12,0,1)
+        self.assertEqual(g.getCafeTables(),None)
+        self.assertEqual(g.routing(12,1),[12,0,1])
+        with self.assertRaises(ValueError):
+            g.saveCafeTables(os.devnull)
+
+    def testContractionHierarchy(self):
+        roads = [(0,1,1),(0,5,9),(0,11,2),(1,2,1),(1,3,1),(2,6,8),(4,10,1),(5,0,1),(5,4,1),(5,6,3),
+            (6,5,1),(6,7,10),(7,5,1),(8,7,4),(8,9,1),(8,10,1),(9,8,1),(10,5,10),(10,8,1),(11,4,1),(12,12,1)]
+        cafes = [(3,1),(5,20),(6,4),(9,2),(11,1)]
+        roadPairs = set([(u,v) for (u,v,w) in roads])
+        g = RoadGraph(roads,cafes)
+        expected = [[g.routing(start,end) for end in range(len(g))] for start in range(len(g))]
+        for witnessLimit in [1,64]:
+            hierarchy = g.buildContractionHierarchy(witnessLimit)
+            self.assertEqual(sorted(hierarchy.rank),list(range(len(g))))
+            for start in range(len(g)):
+                with self.subTest(i=(witnessLimit,start)):
+                    self.assertEqual([g.routing(start,end) for end in range(len(g))],expected[start])
+                    # every point to point distance matches djikstra, and shortcuts are unpacked into roads
+                    state = g.djikstra(start)
+                    for end in range(len(g)):
+                        (dist,path) = hierarchy.query(start,end)
+                        self.assertEqual(dist,state.distOf(end))
+                        if(path!=None):
+                            self.assertEqual((path[0],path[-1]),(start,end))
+                            self.assertTrue(all((path[i],path[i+1]) in roadPairs for i in range(len(path)-1)))
+        self.assertEqual(hierarchy.query(8,2),(8,[8,7,5,0,1,2]))
+        self.assertEqual(hierarchy.query(12,0),(float('inf'),None))
+        # the hierarchy is only used while the roads stay the same
+        g.addEdgeByIndex(12,0,1)
+        self.assertEqual(g.getContractionHierarchy(),None)
+        self.assertEqual(g.routing(12,1),[12,0,11,4,10,8,7,5,0,1])
+
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
     unittest.TextTestRunner(verbosity=0).run(suite)
@@ -3,6 +3,24 @@ Assignment 1 FIT2004
 By: Mario Susanto
 """
 
+import bisect
+import csv
+from array import array
+from collections import OrderedDict, deque
+import heapq
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import struct
+import tempfile
+
+try:
+    import numpy as np
+except ImportError: # numpy is optional and only used by the vectorized backends
+    np = None
+
 def alphabetVal(chr):
     """
     description:
@@ -139,13 +157,287 @@ def countingSortResultsNumeric(arr,base=10,resultsIndex=-1): # time: O(kN), spac
         posList[it] += 1 
     return resultList
 
-def radixSortResults(results):
+class ScoreDomain:
+    def __init__(self,maxScore=100,inverse=None,decimals=0):
+        """
+        description:
+            describes the scores of a sport, which go from 0 to maxScore in steps of 10^-decimals
+            scores are sorted by their integer key, which is the score multiplied by 10^decimals
+        input parameters:
+            maxScore - the largest possible score
+            inverse - a function that gets the score of team2 from the score of team1, or None for maxScore - score
+                (it has to be defined at the top level of a module to be used by analyzeParallel)
+            decimals - the number of decimal places that scores can have
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        self.maxScore = maxScore
+        self.inverse = inverse
+        self.decimals = decimals
+        self.scale = 10 ** decimals
+        self.maxKey = int(round(maxScore * self.scale))
+
+    def toKey(self,score):
+        """
+        description:
+            gets the integer key of a score
+        input parameters:
+            score - a score from 0 to maxScore
+        outputs:
+            an integer from 0 to maxKey
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        key = int(round(score * self.scale))
+        if(key<0 or key>self.maxKey):
+            raise ValueError("score %s is outside of the score domain" % score)
+        return key
+
+    def fromKey(self,key):
+        """
+        description:
+            gets the score of an integer key
+        input parameters:
+            key - an integer from 0 to maxKey
+        outputs:
+            the score, which is an integer if there are no decimal places
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        return key if self.decimals==0 else key / self.scale
+
+    def ceilKey(self,score):
+        """
+        description:
+            gets the smallest key whose score is at least score (which doesn't have to be within the domain)
+        input parameters:
+            score - any number
+        outputs:
+            an integer key
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        key = int(round(score * self.scale))
+        return key + 1 if self.fromKey(key)<score else key
+
+    def floorKey(self,score):
+        """
+        description:
+            gets the largest key whose score is at most score (which doesn't have to be within the domain)
+        input parameters:
+            score - any number
+        outputs:
+            an integer key
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        key = int(round(score * self.scale))
+        return key - 1 if self.fromKey(key)>score else key
+
+    def inverseOf(self,score):
+        """
+        description:
+            gets the score of team2 from the score of team1
+        input parameters:
+            score - the score of team1
+        outputs:
+            the score of team2
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        if(self.inverse!=None):
+            return self.inverse(score)
+        return self.fromKey(self.maxKey - self.toKey(score))
+
+# scores from 0 to 100, where the inverse of a score is 100 - score
+DEFAULT_SCORE_DOMAIN = ScoreDomain()
+
+class SortKey:
+    def __init__(self,getKey,keyType="int",descending=False,minValue=None,maxValue=None,alphabet=None):
+        """
+        description:
+            describes one field of a record that radixSort sorts by
+        input parameters:
+            getKey - a function that gets the field from a record
+            keyType - the type of the field, which is one of:
+                "int" - an integer from minValue to maxValue
+                "alpha" - a string made of the characters in alphabet, where shorter strings come first if they are a prefix
+                "string" - a string made of any characters, where the alphabet is found from the records
+            descending - a boolean stating whether to sort the field in descending order
+            minValue - the smallest value of an "int" field, or None to find it from the records
+            maxValue - the largest value of an "int" field, or None to find it from the records
+            alphabet - the characters of an "alpha" field in ascending order
+        worst case space and time complexity:
+            time complexity - O(A)
+            aux space complexity - O(A)
+            where:
+                A is the length of alphabet
+        """
+        if(keyType not in ["int","alpha","string"]):
+            raise ValueError("unknown key type %s" % keyType)
+        if(keyType=="alpha" and alphabet==None):
+            raise ValueError("an alpha key needs an alphabet")
+        self.getKey = getKey
+        self.keyType = keyType
+        self.descending = descending
+        self.minValue = minValue
+        self.maxValue = maxValue
+        # rank of each character, where 0 is used for padding
+        self.letterRanks = None if alphabet==None else {alphabet[i]: i + 1 for i in range(len(alphabet))}
+
+    def planDigits(self,values,maxBase):
+        """
+        description:
+            plans the counting sort passes needed for this field, from the least significant digit to the most significant
+        input parameters:
+            values - a list of the field of every record
+            maxBase - the largest base that a single pass can have, which is a power of 2
+        outputs:
+            a list of (digitOf,base) tuples, where digitOf gets the digit (from 0 to base - 1) of the record at an index
+        worst case space and time complexity:
+            time complexity - O(MN)
+            aux space complexity - O(M + A)
+            where:
+                N is the length of values
+                M is the length of the longest string (or 1 for "int" fields)
+                A is the number of unique characters
+            explanation:
+                the values are scanned to find the bounds or the alphabet, and one digit is planned per string position
+        """
+        digits = []
+        if(self.keyType=="int"):
+            lo = min(values) if self.minValue==None else self.minValue
+            hi = max(values) if self.maxValue==None else self.maxValue
+            span = hi - lo + 1
+            if(span<=maxBase): # a single counting sort pass
+                digits.append((lambda i: values[i] - lo,span))
+            else: # split into digits of log2(maxBase) bits
+                digitBits = maxBase.bit_length() - 1
+                mask = maxBase - 1
+                for shift in range(0,(span-1).bit_length(),digitBits):
+                    digits.append((lambda i, shift=shift: ((values[i] - lo) >> shift) & mask,min(maxBase,((span-1) >> shift) + 1)))
+        else:
+            letterRanks = self.letterRanks
+            if(letterRanks==None): # find the alphabet from the records
+                letters = sorted(set("".join(values)))
+                letterRanks = {letters[i]: i + 1 for i in range(len(letters))}
+            maxLen = 0
+            for value in values:
+                maxLen = max(maxLen,len(value))
+            # go through each letter, where padding is 0
+            for position in range(maxLen-1,-1,-1):
+                digits.append((lambda i, position=position: letterRanks[values[i][position]] if position < len(values[i]) else 0,
+                    len(letterRanks) + 1))
+        if(self.descending):
+            digits = [(lambda i, digitOf=digitOf, base=base: base - 1 - digitOf(i),base) for (digitOf,base) in digits]
+        return digits
+
+def radixSortOrder(records,keySpec):
+    """
+    description:
+        a least significant digit radix sort engine for any type of record
+        the passes of every field are planned, then adjacent passes are combined into a single pass when
+        the product of their bases is small enough, and passes where every record has the same digit are skipped
+        the count list, digit list and output arrays are allocated once and reused by every pass
+    input parameters:
+        records - a list of records
+        keySpec - a list of SortKey, from the most important field to the least important
+    outputs:
+        an array of the indexes of records in sorted order (records with equal keys keep their original order)
+    worst case space and time complexity:
+        time complexity - O(P(N + B))
+        aux space complexity - O(KN + B)
+        where:
+            N is the number of records
+            K is the number of fields
+            P is the number of passes, which is at most the total number of digits of every field
+            B is the largest base of a pass, which is at most 2^16
+        explanation:
+            each pass is a counting sort of the indexes, and the fields of every record are extracted once
+    """
+    n = len(records)
+    order = array("l",range(n))
+    if(n==0):
+        return order
+    # use passes with a base of about N (within 2^8 and 2^16) so that the count list is no bigger than needed
+    maxBase = 1 << max(8,min(16,n.bit_length()))
+    # plan the digits from least significant to most significant
+    plan = []
+    for key in reversed(keySpec):
+        values = [key.getKey(record) for record in records]
+        for (digitOf,base) in key.planDigits(values,maxBase):
+            # combine this digit with the previous, less significant, digit if the base stays small
+            if(len(plan)>0 and plan[-1][1] * base<=maxBase):
+                (prevDigitOf,prevBase) = plan[-1]
+                plan[-1] = (lambda i, digitOf=digitOf, prevDigitOf=prevDigitOf, prevBase=prevBase: digitOf(i) * prevBase + prevDigitOf(i),
+                    prevBase * base)
+            else:
+                plan.append((digitOf,base))
+    # preallocate the buffers that every pass uses
+    countList = [0] * max([base for (digitOf,base) in plan] + [1])
+    digitList = array("l",bytes(order.itemsize * n))
+    output = array("l",bytes(order.itemsize * n))
+    for (digitOf,base) in plan:
+        # calculate the digit and the frequency of each digit
+        for k in range(base):
+            countList[k] = 0
+        for i in range(n):
+            digit = digitOf(i)
+            digitList[i] = digit
+            countList[digit] += 1
+        # every record has the same digit, so this pass wouldn't change the order
+        if(countList[digitList[0]]==n):
+            continue
+        # turn the count list into the starting indexes of each digit
+        total = 0
+        for k in range(base):
+            count = countList[k]
+            countList[k] = total
+            total += count
+        # add indexes to position based on the starting indexes
+        for i in order:
+            digit = digitList[i]
+            output[countList[digit]] = i
+            countList[digit] += 1
+        order, output = output, order
+    return order
+
+def radixSort(records,keySpec):
+    """
+    description:
+        sorts any type of record by a list of fields using radixSortOrder
+    input parameters:
+        records - a list of records
+        keySpec - a list of SortKey, from the most important field to the least important
+    outputs:
+        a sorted list of the records
+    worst case space and time complexity:
+        time complexity - O(P(N + B))
+        aux space complexity - O(KN + B)
+        where:
+            N is the number of records
+            K is the number of fields
+            P is the number of passes
+            B is the largest base of a pass, which is at most 2^16
+    """
+    return [records[i] for i in radixSortOrder(records,keySpec)]
+
+def radixSortResults(results,useNumpy=False,mode="lsd",domain=None):
     """
     description:
         a function that sorts results using radix sort
         with score being most important, followed by team1, then team2
     input parameters:
         results - a list of matches between 2 teams represented as strings, and the resulting score for each match
+        useNumpy - a boolean stating whether to use the vectorized numpy backend (radixSortResultsNumpy)
+        mode - "lsd" to sort from the last letter of each team, or "msd" to sort from the first letter (radixSortResultsMSD)
+        domain - the ScoreDomain of the scores, or None for scores from 0 to 100
     outputs:
         a sorted version of results
     worst case space and time complexity:
@@ -155,30 +447,247 @@ def radixSortResults(results):
             N is the number of matches in results
             M is the number of characters in each team
         explanation:
-            counting sort (O(N) time) is iterated through M times,
-            and counting sort has a space complexity of O(MN)
+            the radixSort engine does at most 2M + 1 counting sort passes (O(N) time each),
+            and the teams of every match are extracted, which takes O(MN) space
+            teams can have different lengths, and results is not modified
+    """
+    if(useNumpy):
+        return radixSortResultsNumpy(results,domain)
+    if(mode=="msd"):
+        return radixSortResultsMSD(results,16,domain)
+    if(domain==None):
+        domain = DEFAULT_SCORE_DOMAIN
+    # score is most important, followed by team1 and team2 in reverse alphabetical order
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    keySpec = [SortKey(lambda x:domain.toKey(x[2]),"int",minValue=0,maxValue=domain.maxKey),
+        SortKey(lambda x:x[0],"alpha",True,alphabet=alphabet),
+        SortKey(lambda x:x[1],"alpha",True,alphabet=alphabet)]
+    return [[team1,team2,score] for (team1,team2,score) in radixSort(results,keySpec)]
+
+def radixSortResultsMSD(results,cutoff=16,domain=None):
     """
+    description:
+        a version of radixSortResults that sorts the teams from their first letter (most significant digit first)
+        the matches are bucketed by score, then each bucket is split by the next letter of team1 (and then team2),
+        and a bucket stops being split once it has one match, all of its teams are equal, or it is small enough
+        to be insertion sorted, so the number of letters looked at depends on how long the teams' shared prefixes are
+    input parameters:
+        results - a list of matches between 2 teams represented as strings, and the resulting score for each match
+        cutoff - buckets with at most this many matches are insertion sorted instead of split
+        domain - the ScoreDomain of the scores, or None for scores from 0 to 100
+    outputs:
+        a sorted version of results
+    worst case space and time complexity:
+        time complexity - O(DN + N * cutoff)
+        aux space complexity - O(N)
+        where:
+            N is the number of matches in results
+            D is the average length of the prefixes needed to tell the matches apart (at most 2M, where M is the length of the teams)
+        explanation:
+            every match is looked at once for each letter of its distinguishing prefix, and insertion sort
+            takes O(cutoff) time per match, while only the order and a buffer of N indexes are stored
+    """
+    n = len(results)
+    if(domain==None):
+        domain = DEFAULT_SCORE_DOMAIN
+    # bucket by score
+    order = radixSortOrder(results,[SortKey(lambda x:domain.toKey(x[2]),"int",minValue=0,maxValue=domain.maxKey)])
+    buffer = array("l",bytes(order.itemsize * n))
+    digitList = array("l",bytes(order.itemsize * n))
+    countList = [0] * 27
+    # buckets that still need sorting, as (lo,hi,column,position) where column 0 is team1 and 1 is team2
+    stack = []
+    lo = 0
+    for hi in range(1,n+1):
+        if(hi==n or results[order[hi]][2]!=results[order[lo]][2]):
+            stack.append((lo,hi,0,0))
+            lo = hi
+    while(len(stack)>0):
+        (lo,hi,column,position) = stack.pop()
+        if(hi-lo<=1):
+            continue
+        if(hi-lo<=cutoff):
+            # insertion sort in reverse alphabetical order (the letters before position are equal)
+            for j in range(lo+1,hi):
+                i = order[j]
+                key = (results[i][0],results[i][1])
+                k = j - 1
+                while(k>=lo and (results[order[k]][0],results[order[k]][1])<key):
+                    order[k+1] = order[k]
+                    k -= 1
+                order[k+1] = i
+            continue
+        # calculate the digit of each match in reverse alphabetical order, where Z=0, A=25 and padding=26
+        for k in range(27):
+            countList[k] = 0
+        for j in range(lo,hi):
+            team = results[order[j]][column]
+            digit = 26 - alphabetVal(team[position]) if position < len(team) else 26
+            digitList[j] = digit
+            countList[digit] += 1
+        if(countList[digitList[lo]]==hi-lo): # every match has the same digit, so look at the next letter
+            if(digitList[lo]!=26):
+                stack.append((lo,hi,column,position+1))
+            elif(column==0): # every team1 is equal, so sort by team2
+                stack.append((lo,hi,1,0))
+            continue
+        # calculate starting indexes of each digit based on the count list
+        starts = [0] * 28
+        starts[0] = lo
+        for k in range(1,28):
+            starts[k] = starts[k-1] + countList[k-1]
+        posList = starts[:27]
+        # add indexes to position based on the position list
+        for j in range(lo,hi):
+            digit = digitList[j]
+            buffer[posList[digit]] = order[j]
+            posList[digit] += 1
+        order[lo:hi] = buffer[lo:hi]
+        # split into a bucket for each digit
+        for digit in range(26):
+            stack.append((starts[digit],starts[digit+1],column,position+1))
+        if(column==0): # teams that have ended are equal, so sort them by team2
+            stack.append((starts[26],starts[27],1,0))
+    return [[results[i][0],results[i][1],results[i][2]] for i in order]
+
+def radixSortResultsNumpy(results,domain=None):
+    """
+    description:
+        a vectorized version of radixSortResults that gives an identical output
+        the teams are encoded as padded uint8 columns (@=0, A=1, B=2, etc) and the scores as an integer column,
+        then the same least significant digit passes are done as stable argsorts of a permutation
+    input parameters:
+        results - a list of matches between 2 teams represented as strings, and the resulting score for each match
+        domain - the ScoreDomain of the scores, or None for scores from 0 to 100
+    outputs:
+        a sorted version of results
+    worst case space and time complexity:
+        time complexity - O(MN)
+        aux space complexity - O(MN)
+        where:
+            N is the number of matches in results
+            M is the number of characters in each team
+        explanation:
+            there are 2M + 1 stable passes, each of which is a linear radix sort inside numpy
+            since every key fits within 16 bits, and the encoded columns take O(MN) space
+    """
+    if(np is None):
+        raise ImportError("radixSortResultsNumpy requires numpy")
+    n = len(results)
+    if(n==0):
+        return []
     # get maximum string length
     maxLen = 0
     for (team1,team2,score) in results:
-        if(len(team1)>maxLen):
-            maxLen = len(team1)
-        if(len(team2)>maxLen):
-            maxLen = len(team2)
-    # pad string to ensure the same length
-    # (@ is used because it is the ASCII letter before A, which makes counting sort more straightfoward)
-    for i in range(len(results)):
-        results[i][0] = results[i][0] + "@" * (maxLen - len(results[i][0]))
-        results[i][1] = results[i][1] + "@" * (maxLen - len(results[i][0]))
-    # sort team2, then team1
-    for resultsIndex in [1,0]:
-        # go through each letter and sort in reverse alphabetical order
-        for i in range(maxLen-1,-1,-1):
-            results = countingSortAlpha(results,i,resultsIndex,True)
+        maxLen = max(maxLen,len(team1),len(team2))
+    # the permutation of results, which every pass reorders
+    order = np.arange(n)
+    if(maxLen>0):
+        for resultsIndex in [1,0]: # sort team2, then team1
+            # pad with @ and view the column as an N x maxLen matrix of letter values
+            column = np.array([item[resultsIndex].ljust(maxLen,"@").encode("ascii") for item in results],dtype="S%d" % maxLen)
+            letters = column.view(np.uint8).reshape(n,maxLen).astype(np.int16) - 64
+            # go through each letter and sort in reverse alphabetical order
+            for i in range(maxLen-1,-1,-1):
+                order = order[np.argsort(26 - letters[order,i],kind="stable")]
     # sort by score
-    results = countingSortResultsNumeric(results,101,2)
-    # remove all padding and return sorted results
-    return [[team1.replace("@",""),team2.replace("@",""),score] for (team1, team2, score) in results]
+    if(domain==None):
+        domain = DEFAULT_SCORE_DOMAIN
+    scores = np.array([domain.toKey(item[2]) for item in results],dtype=np.int64)
+    order = order[np.argsort(scores[order],kind="stable")]
+    # only the encoded columns were padded, so the teams of results can be returned as they are
+    return [[results[i][0],results[i][1],results[i][2]] for i in order.tolist()]
+
+def packTeam(team,bitsPerLetter,maxLen):
+    """
+    description:
+        packs a team into a single integer, where each letter takes bitsPerLetter bits (A=1, B=2, etc)
+        and shorter teams are padded with zeros, so comparing keys is the same as comparing the padded teams
+    input parameters:
+        team - a string comprized of alphabetic capital letters
+        bitsPerLetter - the number of bits used by each letter
+        maxLen - the length that the team is padded to
+    outputs:
+        an integer key for the team
+    worst case space and time complexity:
+        time complexity - O(M)
+        aux space complexity - O(1)
+        where:
+            M is the length of the team
+        explanation:
+            each letter is shifted into the key once, and no new strings are created
+    """
+    key = 0
+    limit = 1 << bitsPerLetter
+    for letter in team:
+        letterVal = alphabetVal(letter)
+        if(letterVal<=0 or letterVal>=limit):
+            raise ValueError("team %s has a letter outside of the roster" % team)
+        key = (key << bitsPerLetter) | letterVal
+    # padding is represented by zeros
+    return key << (bitsPerLetter * (maxLen - len(team)))
+
+def radixSortResultsPacked(results,roster,domain=None):
+    """
+    description:
+        a function that sorts results into the same order as radixSortResults, using packed integer keys
+        each team is packed into log2(roster+1) bits per letter, and (score, team1, team2) is packed into one key,
+        which is then sorted with a few counting sort passes over groups of bits
+    input parameters:
+        results - a list of matches between 2 teams represented as strings, and the resulting score for each match
+        roster - the number of possible characters that could show up in results
+        domain - the ScoreDomain of the scores, or None for scores from 0 to 100
+    outputs:
+        a sorted version of results
+    worst case space and time complexity:
+        time complexity - O(MN + PN)
+        aux space complexity - O(N)
+        where:
+            N is the number of matches in results
+            M is the number of characters in each team
+            P is the number of passes, which is (2M*log2(roster+1) + log2(maxKey)) / log2(N) rounded up
+        explanation:
+            packing every key takes O(MN) time, then each counting sort pass takes O(N) time,
+            and since the teams are never padded only the keys and the sorted output are created
+    """
+    n = len(results)
+    if(n==0):
+        return []
+    # get maximum string length
+    maxLen = 0
+    for (team1,team2,score) in results:
+        maxLen = max(maxLen,len(team1),len(team2))
+    if(domain==None):
+        domain = DEFAULT_SCORE_DOMAIN
+    bitsPerLetter = max(roster,1).bit_length()
+    teamBits = bitsPerLetter * maxLen
+    maxTeamKey = (1 << teamBits) - 1
+    # score is most important, followed by team1 and team2 (which are in reverse alphabetical order)
+    keys = [(domain.toKey(score) << (2*teamBits)) | ((maxTeamKey - packTeam(team1,bitsPerLetter,maxLen)) << teamBits)
+        | (maxTeamKey - packTeam(team2,bitsPerLetter,maxLen)) for (team1,team2,score) in results]
+    order = radixSortKeys(keys,2*teamBits + domain.maxKey.bit_length())
+    return [[results[i][0],results[i][1],results[i][2]] for i in order]
+
+def radixSortKeys(keys,totalBits):
+    """
+    description:
+        a function that finds the order of non-negative integer keys using the radixSort engine,
+        which splits them into digits of 8 to 16 bits
+    input parameters:
+        keys - a list of non-negative integers
+        totalBits - the number of bits needed for the largest key
+    outputs:
+        a list of the indexes of keys in ascending order of key (ties keep their original order)
+    worst case space and time complexity:
+        time complexity - O(PN)
+        aux space complexity - O(N)
+        where:
+            N is the length of keys
+            P is the number of passes, which is totalBits / log2(N) rounded up
+        explanation:
+            each pass is a counting sort over a count list that is no bigger than needed
+    """
+    return radixSortOrder(keys,[SortKey(lambda x:x,"int",minValue=0,maxValue=(1 << totalBits) - 1)]).tolist()
 
 def alphabeticalOrder(strVal):
     """
@@ -200,6 +709,49 @@ def alphabeticalOrder(strVal):
     # do counting sort and revert output back to a string
     return "".join(countingSortAlpha(strVal))
 
+def alphabeticalOrderBulk(teams,roster=26):
+    """
+    description:
+        orders every team in a list alphabetically, giving the same output as alphabeticalOrder
+        the teams are encoded as an N x M matrix of letter values, then one bincount gives the letter histogram of every row,
+        and repeating each letter by its count (with padding as the last letter) writes out every sorted team at once
+        numpy is used if it is installed, otherwise alphabeticalOrder is called for each team
+    input parameters:
+        teams - a list of strings comprized of alphabetic capital letters
+        roster - the number of possible characters that could show up in the teams
+    outputs:
+        a list of alphabetically ordered strings
+    worst case space and time complexity:
+        time complexity - O(N(M + roster))
+        aux space complexity - O(N(M + roster))
+        where:
+            N is the number of teams
+            M is the length of the longest team
+        explanation:
+            every vectorized pass is over either the letter matrix or the histograms
+    """
+    if(np is None):
+        return [alphabeticalOrder(team) for team in teams]
+    n = len(teams)
+    maxLen = 0
+    for team in teams:
+        maxLen = max(maxLen,len(team))
+    if(maxLen==0):
+        return ["" for team in teams]
+    # pad with @ and view the teams as an N x maxLen matrix of letter values (@=0, A=1, B=2, etc)
+    letters = np.array([team.ljust(maxLen,"@").encode("ascii") for team in teams],dtype="S%d" % maxLen)
+    letters = letters.view(np.uint8).reshape(n,maxLen).astype(np.int64) - 64
+    if(letters.min()<0 or letters.max()>roster):
+        raise ValueError("a team has a letter outside of the roster")
+    # histogram of each row, with padding moved to the last column
+    counts = np.bincount((np.arange(n)[:,None] * (roster + 1) + letters).ravel(),minlength=n * (roster + 1)).reshape(n,roster + 1)
+    counts = np.roll(counts,-1,axis=1)
+    # write each letter out as many times as it occurs, where padding is written as a null byte
+    letterBytes = np.append(np.arange(65,65 + roster),0).astype(np.uint8)
+    ordered = np.repeat(np.tile(letterBytes,n),counts.ravel()).view("S%d" % maxLen)
+    # trailing null bytes are dropped when the teams are converted back into strings
+    return [team.decode("ascii") for team in ordered.tolist()]
+
 def removeDuplicatesFromSorted(arr,key=lambda x:x):
     """
     description:
@@ -267,7 +819,821 @@ def binarySearch(arr,value,key=lambda x:x):
             lo = mid + 1
     return mid, key(arr[mid])
 
-def analyze(results, roster, score):
+class LRUCache:
+    def __init__(self,capacity):
+        """
+        description:
+            a cache that holds at most capacity items, removing the least recently used item when it is full
+        input parameters:
+            capacity - the maximum number of items in the cache
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        self.capacity = capacity
+        self.items = OrderedDict() # from least recently used to most recently used
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """
+        description:
+            gets the number of items in the cache
+        outputs:
+            the number of items in the cache
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        return len(self.items)
+
+    def get(self,key):
+        """
+        description:
+            gets the value stored for a key, marking it as the most recently used
+        input parameters:
+            key - the key to look up
+        outputs:
+            the value, or None if the key isn't in the cache
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        value = self.items.get(key)
+        if(value==None):
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.items.move_to_end(key)
+        return value
+
+    def put(self,key,value):
+        """
+        description:
+            stores a value for a key, removing the least recently used item if the cache is full
+        input parameters:
+            key - the key to store the value for
+            value - the value to store, which can't be None
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if(len(self.items)>self.capacity):
+            self.items.popitem(last=False)
+
+class ResultsColumns:
+    def __init__(self,results,cacheSize=4096,domain=None):
+        """
+        description:
+            a columnar copy of results, where each team is ordered alphabetically and stored as an integer id
+            the inverse of every match isn't stored, but is viewed on the fly as the rows after the matches
+            (row i + N is the inverse of row i), and results itself is never modified
+            the ids of recently seen teams are cached, so each unique team is usually only ordered alphabetically once,
+            and the teams that aren't cached are ordered together with alphabeticalOrderBulk, cacheSize matches at a time
+        input parameters:
+            results - a list of matches between 2 teams represented as strings, and the resulting score for each match
+            cacheSize - the maximum number of teams (as they appear in results) whose ids are cached
+            domain - the ScoreDomain of the scores, or None for scores from 0 to 100
+                (scores are stored as their keys, and inverse scores are only stored if domain has its own inverse function)
+        worst case space and time complexity:
+            time complexity - O(MN)
+            aux space complexity - O(N + MT + M * cacheSize)
+            where:
+                N is the number of matches in results
+                M is the number of characters in each team
+                T is the number of unique teams
+            explanation:
+                every team is hashed in O(M) time, and ordered alphabetically in O(M) time when it isn't cached,
+                but only 3 integer columns of length N and one string for each unique or cached team are stored
+                (along with the ids of the teams in the current block of cacheSize matches)
+        """
+        self.teamIds = {} # alphabetically ordered team to team id
+        self.teamNames = [] # team id to alphabetically ordered team
+        self.rawTeamIds = LRUCache(cacheSize) # team as it appears in results to team id
+        self.domain = DEFAULT_SCORE_DOMAIN if domain==None else domain
+        self.team1 = array("l")
+        self.team2 = array("l")
+        self.scores = array("q") # score keys
+        self.inverseScores = None if self.domain.inverse==None else array("q") # inverse score keys
+        block = []
+        for match in results:
+            block.append(match)
+            if(len(block)>=cacheSize):
+                self.addBlock(block)
+                block = []
+        self.addBlock(block)
+        self.matchCount = len(self.scores)
+
+    def addBlock(self,block):
+        """
+        description:
+            adds a block of matches to the columns, where every team that isn't cached is ordered alphabetically in one bulk call
+        input parameters:
+            block - a list of matches in the format (team1,team2,score)
+        worst case space and time complexity:
+            time complexity - O(MB)
+            aux space complexity - O(MB)
+            where:
+                B is the number of matches in block
+                M is the number of characters in each team
+        """
+        # find the id of each team in the block, and the teams that aren't cached
+        blockIds = {}
+        misses = []
+        for (team1,team2,score) in block:
+            for rawTeam in [team1,team2]:
+                if(rawTeam not in blockIds):
+                    teamId = self.rawTeamIds.get(rawTeam)
+                    blockIds[rawTeam] = teamId
+                    if(teamId==None):
+                        misses.append(rawTeam)
+        ordered = alphabeticalOrderBulk(misses)
+        for i in range(len(misses)):
+            teamId = self.teamId(ordered[i])
+            blockIds[misses[i]] = teamId
+            self.rawTeamIds.put(misses[i],teamId)
+        for (team1,team2,score) in block:
+            self.team1.append(blockIds[team1])
+            self.team2.append(blockIds[team2])
+            self.scores.append(self.domain.toKey(score))
+            if(self.inverseScores!=None):
+                self.inverseScores.append(self.domain.toKey(self.domain.inverse(score)))
+
+    def teamId(self,team):
+        """
+        description:
+            gets the id of an alphabetically ordered team, giving it a new id if it hasn't been seen before
+        input parameters:
+            team - an alphabetically ordered team
+        outputs:
+            the integer id of the team
+        worst case space and time complexity:
+            time complexity - O(M)
+            aux space complexity - O(M)
+            where:
+                M is the number of characters in the team
+        """
+        teamId = self.teamIds.get(team)
+        if(teamId==None):
+            teamId = len(self.teamNames)
+            self.teamIds[team] = teamId
+            self.teamNames.append(team)
+        return teamId
+
+    def __len__(self):
+        """
+        description:
+            gets the number of rows, counting the inverse of every match
+        outputs:
+            twice the number of matches
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        return 2 * self.matchCount
+
+    def team1Of(self,i):
+        """
+        description:
+            gets the id of team1 in row i, where rows from N onwards are inverses
+        input parameters:
+            i - the index of the row
+        outputs:
+            a team id
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        return self.team1[i] if i < self.matchCount else self.team2[i - self.matchCount]
+
+    def team2Of(self,i):
+        """
+        description:
+            gets the id of team2 in row i, where rows from N onwards are inverses
+        input parameters:
+            i - the index of the row
+        outputs:
+            a team id
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        return self.team2[i] if i < self.matchCount else self.team1[i - self.matchCount]
+
+    def scoreOf(self,i):
+        """
+        description:
+            gets the score key in row i, where rows from N onwards are inverses
+        input parameters:
+            i - the index of the row
+        outputs:
+            the key of the score of team1 against team2
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        if(i < self.matchCount):
+            return self.scores[i]
+        elif(self.inverseScores==None):
+            return self.domain.maxKey - self.scores[i - self.matchCount]
+        return self.inverseScores[i - self.matchCount]
+
+    def row(self,i):
+        """
+        description:
+            decodes row i into the format [team1,team2,score]
+        input parameters:
+            i - the index of the row
+        outputs:
+            a match with strings for both teams
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        return [self.teamNames[self.team1Of(i)],self.teamNames[self.team2Of(i)],self.domain.fromKey(self.scoreOf(i))]
+
+def rankTeams(teamNames,roster):
+    """
+    description:
+        finds the alphabetical rank of every team by radix sorting their packed integer keys
+    input parameters:
+        teamNames - a list of unique teams
+        roster - the number of possible characters that could show up in the teams
+    outputs:
+        a list where the ith item is the rank of teamNames[i] (0 being first alphabetically)
+    worst case space and time complexity:
+        time complexity - O(MT)
+        aux space complexity - O(T)
+        where:
+            T is the number of teams
+            M is the number of characters in each team
+    """
+    maxLen = 0
+    for team in teamNames:
+        maxLen = max(maxLen,len(team))
+    bitsPerLetter = max(roster,1).bit_length()
+    order = radixSortKeys([packTeam(team,bitsPerLetter,maxLen) for team in teamNames],bitsPerLetter * maxLen)
+    ranks = [0] * len(teamNames)
+    for rank in range(len(order)):
+        ranks[order[rank]] = rank
+    return ranks
+
+class AnalysisResult:
+    def __init__(self,sortedResults,counts=None,domain=None):
+        """
+        description:
+            the analysis of a list of matches, which indexes where each score starts within the sorted matches
+            so that top 10 and score queries can be answered without re-sorting
+            if the domain has no more score keys than max(256,N), the index is a table with an offset for every score key
+            so that queries don't need to search, otherwise only the scores that occur are indexed and queries binary search them
+        input parameters:
+            sortedResults - canonical matches without duplicates, in the order given by radixSortResults
+            counts - a list where the ith item is how many times sortedResults[i] occurred, or None if unknown
+            domain - the ScoreDomain of the scores, or None for scores from 0 to 100
+        worst case space and time complexity:
+            time complexity - O(N)
+            aux space complexity - O(min(S,N + 256))
+            where:
+                N is the number of matches in sortedResults
+                S is the number of score keys in the domain
+            explanation:
+                every score is read once, and the table is only built when it is no bigger than max(256,N)
+        """
+        self.sortedResults = sortedResults
+        self.counts = counts
+        self.domain = DEFAULT_SCORE_DOMAIN if domain==None else domain
+        self.teamPostings = None # team1 to the indexes of its matches, built by buildTeamIndex
+        self.pairPostings = None # (team1,team2) to the indexes of their matches, built by buildTeamIndex
+        # scoreKeys[g] is the key of the gth distinct score in ascending order, and groupStarts[g] is the index of its first match
+        # groupStarts has one more offset at the end, which is the number of matches
+        self.scoreKeys = []
+        self.groupStarts = []
+        for i in range(len(sortedResults)):
+            key = self.domain.toKey(sortedResults[i][2])
+            if(len(self.scoreKeys)==0 or self.scoreKeys[-1]!=key):
+                self.scoreKeys.append(key)
+                self.groupStarts.append(i)
+        self.groupStarts.append(len(sortedResults))
+        self.scoreStart = None
+        self.nextScore = None
+        if(self.domain.maxKey + 1<=max(256,len(sortedResults))):
+            # scoreStart[k] is the index of the first match with a score key of at least k, scoreStart[maxKey + 1] is the end
+            # nextScore[k] is the smallest score key at least k that has any matches, or None if there is none
+            self.scoreStart = [len(sortedResults)] * (self.domain.maxKey + 2)
+            self.nextScore = [None] * (self.domain.maxKey + 1)
+            group = len(self.scoreKeys)
+            for k in range(self.domain.maxKey,-1,-1):
+                if(group>0 and self.scoreKeys[group-1]>=k):
+                    group -= 1
+                self.scoreStart[k] = self.groupStarts[group]
+                self.nextScore[k] = self.scoreKeys[group] if group<len(self.scoreKeys) else None
+
+    def __len__(self):
+        """
+        description:
+            gets the number of unique canonical matches (inverses included)
+        outputs:
+            the number of unique canonical matches
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        return len(self.sortedResults)
+
+    def getMatches(self,start,end,withCounts=False):
+        """
+        description:
+            gets the sorted matches from start up to (but not including) end, in reverse order
+        input parameters:
+            start - the index of the first match
+            end - the index after the last match
+            withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        outputs:
+            a list of matches
+        worst case space and time complexity:
+            time complexity - O(1 + K)
+            aux space complexity - O(K)
+            where:
+                K is the number of matches returned
+        """
+        if(not withCounts):
+            matches = self.sortedResults[start:end]
+        elif(self.counts==None):
+            raise ValueError("the number of times each match occurred is unknown")
+        else:
+            matches = [self.sortedResults[i] + [self.counts[i]] for i in range(start,end)]
+        matches.reverse()
+        return matches
+
+    def top10(self,withCounts=False):
+        """
+        description:
+            gets the 10 unique matches with the highest score
+        input parameters:
+            withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        outputs:
+            10 unique matches with the highest score for the winning team
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+            explanation:
+                the last 10 sorted matches are copied and reversed
+        """
+        return self.getMatches(max(0,len(self.sortedResults)-10),len(self.sortedResults),withCounts)
+
+    def scoreSlice(self,lo,hi,withCounts=False):
+        """
+        description:
+            gets every match with a score key from lo to hi (inclusive), with the highest score first
+        input parameters:
+            lo - the smallest score key, which has to be between 0 and maxKey
+            hi - the largest score key, which has to be between 0 and maxKey
+            withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        outputs:
+            a list of matches
+        worst case space and time complexity:
+            time complexity - O(1 + K) with the score table, O(log(D) + K) otherwise
+            aux space complexity - O(K)
+            where:
+                D is the number of distinct scores
+                K is the number of matches returned
+        """
+        if(self.scoreStart!=None):
+            return self.getMatches(self.scoreStart[lo],self.scoreStart[hi+1],withCounts)
+        start = self.groupStarts[bisect.bisect_left(self.scoreKeys,lo)]
+        end = self.groupStarts[bisect.bisect_right(self.scoreKeys,hi)]
+        return self.getMatches(start,end,withCounts)
+
+    def matchesForScore(self,score,withCounts=False):
+        """
+        description:
+            gets every match with a particular score, or with the next highest score if there are none
+        input parameters:
+            score - the score to search for
+            withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        outputs:
+            every match that either resulted in the same score as score, or the next highest score
+        worst case space and time complexity:
+            time complexity - O(1 + K) with the score table, O(log(D) + K) otherwise
+            aux space complexity - O(K)
+            where:
+                D is the number of distinct scores
+                K is the number of matches returned
+        """
+        key = self.domain.ceilKey(score)
+        if(self.nextScore!=None):
+            if(key>self.domain.maxKey):
+                return []
+            found = self.nextScore[max(0,key)]
+            if(found==None):
+                return []
+            return self.scoreSlice(found,found,withCounts)
+        group = bisect.bisect_left(self.scoreKeys,key)
+        if(group==len(self.scoreKeys)):
+            return []
+        return self.getMatches(self.groupStarts[group],self.groupStarts[group+1],withCounts)
+
+    def matchesForScores(self,scores,withCounts=False):
+        """
+        description:
+            answers matchesForScore for a batch of scores
+        input parameters:
+            scores - a list of scores to search for
+            withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        outputs:
+            a list containing the output of matchesForScore for each score
+        worst case space and time complexity:
+            time complexity - O(S + K) with the score table, O(S*log(D) + K) otherwise
+            aux space complexity - O(K)
+            where:
+                S is the number of scores
+                D is the number of distinct scores
+                K is the total number of matches returned
+        """
+        return [self.matchesForScore(score,withCounts) for score in scores]
+
+    def scoreRange(self,lo,hi,withCounts=False):
+        """
+        description:
+            gets every match with a score from lo to hi (inclusive), with the highest score first
+            and matches with the same score in alphabetical order
+        input parameters:
+            lo - the smallest score to include
+            hi - the largest score to include
+            withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        outputs:
+            a list of matches
+        worst case space and time complexity:
+            time complexity - O(1 + K) with the score table, O(log(D) + K) otherwise
+            aux space complexity - O(K)
+            where:
+                D is the number of distinct scores
+                K is the number of matches returned
+        """
+        lo = max(0,self.domain.ceilKey(lo))
+        hi = min(self.domain.maxKey,self.domain.floorKey(hi))
+        if(lo>hi):
+            return []
+        return self.scoreSlice(lo,hi,withCounts)
+
+    def buildTeamIndex(self):
+        """
+        description:
+            builds the secondary indexes from each team (and each pair of teams) to the indexes of their matches,
+            with the highest score first. this is done the first time a team query is made
+        worst case space and time complexity:
+            time complexity - O(MN)
+            aux space complexity - O(N)
+            where:
+                N is the number of matches
+                M is the number of characters in each team
+            explanation:
+                the sorted matches are looped through backwards once, hashing both teams of each match
+        """
+        self.teamPostings = {}
+        self.pairPostings = {}
+        for i in range(len(self.sortedResults)-1,-1,-1):
+            (team1,team2,score) = self.sortedResults[i]
+            self.teamPostings.setdefault(team1,[]).append(i)
+            self.pairPostings.setdefault((team1,team2),[]).append(i)
+
+    def getPostings(self,postings,n,withCounts):
+        """
+        description:
+            gets the first n matches of a posting list
+        input parameters:
+            postings - a list of indexes of sorted matches
+            n - the maximum number of matches to get, or None for every match
+            withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        outputs:
+            a list of matches
+        worst case space and time complexity:
+            time complexity - O(1 + K)
+            aux space complexity - O(K)
+            where:
+                K is the number of matches returned
+        """
+        if(n!=None):
+            postings = postings[:n]
+        if(not withCounts):
+            return [self.sortedResults[i] for i in postings]
+        elif(self.counts==None):
+            raise ValueError("the number of times each match occurred is unknown")
+        return [self.sortedResults[i] + [self.counts[i]] for i in postings]
+
+    def teamTop(self,team,n=10,withCounts=False):
+        """
+        description:
+            gets the best results of a team, with the highest score first
+            and matches with the same score ordered alphabetically by the opposing team
+        input parameters:
+            team - a team, which doesn't have to be ordered alphabetically
+            n - the maximum number of matches to get, or None for every match
+            withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        outputs:
+            a list of matches where team1 is the team
+        worst case space and time complexity:
+            time complexity - O(M + K)
+            aux space complexity - O(M + K)
+            where:
+                M is the number of characters in team
+                K is the number of matches returned
+        """
+        if(self.teamPostings==None):
+            self.buildTeamIndex()
+        return self.getPostings(self.teamPostings.get(alphabeticalOrder(team),[]),n,withCounts)
+
+    def headToHead(self,team1,team2,withCounts=False):
+        """
+        description:
+            gets every match between two teams from the point of view of team1, with the highest score first
+        input parameters:
+            team1 - a team, which doesn't have to be ordered alphabetically
+            team2 - a team, which doesn't have to be ordered alphabetically
+            withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        outputs:
+            a list of matches between team1 and team2
+        worst case space and time complexity:
+            time complexity - O(M + K)
+            aux space complexity - O(M + K)
+            where:
+                M is the number of characters in each team
+                K is the number of matches returned
+        """
+        if(self.pairPostings==None):
+            self.buildTeamIndex()
+        return self.getPostings(self.pairPostings.get((alphabeticalOrder(team1),alphabeticalOrder(team2)),[]),None,withCounts)
+
+def aggregateColumns(columns):
+    """
+    description:
+        collapses identical rows of columns (inverses included) into unique keys, counting how many times each occurred
+    input parameters:
+        columns - a ResultsColumns
+    outputs:
+        a dictionary from (score,team1 id,team2 id) to the number of rows with that key
+    worst case space and time complexity:
+        time complexity - O(N)
+        aux space complexity - O(U)
+        where:
+            N is the number of matches
+            U is the number of unique keys
+        explanation:
+            every row is hashed once, and only the unique keys are stored
+    """
+    counts = {}
+    for i in range(len(columns)):
+        key = (columns.scoreOf(i),columns.team1Of(i),columns.team2Of(i))
+        counts[key] = counts.get(key,0) + 1
+    return counts
+
+def radixSortMatchKeys(keys,ranks,maxKey=100):
+    """
+    description:
+        a function that finds the order of (score,team1 id,team2 id) keys that radixSortResults would give,
+        with score being most important, followed by team1, then team2
+    input parameters:
+        keys - a list of (score key,team1 id,team2 id) tuples
+        ranks - a list where the ith item is the alphabetical rank of team id i
+        maxKey - the largest score key
+    outputs:
+        an array of indexes of keys in sorted order
+    worst case space and time complexity:
+        time complexity - O(U + T)
+        aux space complexity - O(U + T)
+        where:
+            U is the number of keys
+            T is the number of unique teams
+        explanation:
+            the radixSort engine does at most 3 counting sorts on the key indexes
+    """
+    teamCount = len(ranks)
+    # sort score, then team1 and team2 in reverse alphabetical order
+    keySpec = [SortKey(lambda key: key[0],"int",minValue=0,maxValue=maxKey),
+        SortKey(lambda key: ranks[key[1]],"int",True,0,teamCount - 1),
+        SortKey(lambda key: ranks[key[2]],"int",True,0,teamCount - 1)]
+    return radixSortOrder(keys,keySpec)
+
+def analyzeResults(results, roster, domain=None):
+    """
+    description:
+        function that sorts and removes duplicates from a list of matches (along with their inverses),
+        and indexes the output so that many queries can be answered from it. results is not modified
+        identical matches are collapsed with a hash table before sorting, so only the unique matches are sorted
+        and the number of times each one occurred is kept
+    input parameters:
+        results - a list of matches between 2 teams represented as strings, and the resulting score for each match
+            format: [(team1,team2,score),(team1,team2,score),...]
+        roster - the number of possible characters that could show up in results (eg A, B, and C are possible when roster = 3)
+        domain - the ScoreDomain of the scores, or None for scores from 0 to 100
+    outputs:
+        an AnalysisResult, with the number of times each match occurred
+    worst case space and time complexity:
+        time complexity - O(MN)
+        aux space complexity - O(N + MT)
+        where:
+            N is the number of matches in results
+            M is the number of characters in each team
+            T is the number of unique teams
+        explanation:
+            ordering every team alphabetically takes O(MN) time, while the columns take O(N) space
+            and only the unique teams (and the unique matches in the output) are stored as strings
+    """
+    # store results as alphabetically ordered team id columns, with the inverses of each match as a view
+    columns = ResultsColumns(results,domain=domain)
+    # collapse identical rows into unique keys with counts
+    counts = aggregateColumns(columns)
+    keys = list(counts)
+    # radix sort the unique keys
+    order = radixSortMatchKeys(keys,rankTeams(columns.teamNames,roster),columns.domain.maxKey)
+    # decode the unique keys
+    sortedResults = []
+    sortedCounts = []
+    for i in order:
+        (scoreKey,team1,team2) = keys[i]
+        sortedResults.append([columns.teamNames[team1],columns.teamNames[team2],columns.domain.fromKey(scoreKey)])
+        sortedCounts.append(counts[keys[i]])
+    # index the sorted results by score
+    return AnalysisResult(sortedResults,sortedCounts,columns.domain)
+
+def mergeSortedUnique(arr1,arr2,key,limit=None,combine=None):
+    """
+    description:
+        merges two sorted lists without duplicates into a single sorted list without duplicates
+    input parameters:
+        arr1 - a sorted list without duplicates
+        arr2 - a sorted list without duplicates
+        key - a function used to extract the value to sort and compare duplicates with
+        limit - the maximum number of items to output, or None for no limit
+        combine - a function that merges an item from each list with the same key, or None to keep the first item
+    outputs:
+        a sorted list without duplicates
+    worst case space and time complexity:
+        time complexity - O(N1 + N2)
+        aux space complexity - O(N1 + N2)
+        where:
+            N1 is the length of arr1
+            N2 is the length of arr2
+    """
+    merged = []
+    i = 0
+    j = 0
+    while(i<len(arr1) or j<len(arr2)):
+        if(j==len(arr2) or (i<len(arr1) and key(arr1[i])<=key(arr2[j]))):
+            item = arr1[i]; i += 1
+        else:
+            item = arr2[j]; j += 1
+        # the item is a duplicate of the last item (which can only come from the other list)
+        if(len(merged)>0 and key(merged[-1])==key(item)):
+            if(combine!=None):
+                merged[-1] = combine(merged[-1],item)
+        elif(limit!=None and len(merged)==limit):
+            break
+        else:
+            merged.append(item)
+    return merged
+
+def addCounts(match1,match2):
+    """
+    description:
+        combines two copies of the same match in the format [team1,team2,score,count] by adding their counts
+    input parameters:
+        match1 - a match with a count
+        match2 - the same match with another count
+    outputs:
+        the match with the sum of both counts
+    worst case space and time complexity:
+        time complexity - O(1)
+        aux space complexity - O(1)
+    """
+    return [match1[0],match1[1],match1[2],match1[3] + match2[3]]
+
+class PartialSummary:
+    def __init__(self,top10matches,searchedMatches,withCounts=False):
+        """
+        description:
+            the output of analyze for part of the matches, which can be merged with the summaries of the other parts
+            the top 10 of all matches are always within the top 10 of the parts that they came from,
+            and the searched score of all matches is the lowest of the searched scores of the parts,
+            so only the top 10 and the searched score group of each part need to be kept
+        input parameters:
+            top10matches - 10 unique matches with the highest score for the winning team
+            searchedMatches - every match that either resulted in the same score as score, or the next highest score
+            withCounts - a boolean stating whether the matches have counts, as [team1,team2,score,count]
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        self.top10matches = top10matches
+        self.searchedMatches = searchedMatches
+        self.withCounts = withCounts
+
+    def merge(self,other):
+        """
+        description:
+            merges this summary with the summary of another part of the matches
+        input parameters:
+            other - a PartialSummary
+        outputs:
+            a PartialSummary of both parts
+        worst case space and time complexity:
+            time complexity - O(K1 + K2)
+            aux space complexity - O(K1 + K2)
+            where:
+                K1 is the number of searched matches in this summary
+                K2 is the number of searched matches in the other summary
+        """
+        # the same match from both parts has its counts added together
+        combine = addCounts if self.withCounts else None
+        top10matches = mergeSortedUnique(self.top10matches,other.top10matches,lambda x:(-x[2],x[0],x[1]),10,combine)
+        if(len(other.searchedMatches)==0):
+            searchedMatches = self.searchedMatches
+        elif(len(self.searchedMatches)==0):
+            searchedMatches = other.searchedMatches
+        elif(self.searchedMatches[0][2]!=other.searchedMatches[0][2]):
+            # keep the lowest score that is at least the searched score
+            searchedMatches = min(self.searchedMatches,other.searchedMatches,key=lambda x:x[0][2])
+        else:
+            searchedMatches = mergeSortedUnique(self.searchedMatches,other.searchedMatches,lambda x:(x[0],x[1]),None,combine)
+        return PartialSummary(top10matches,searchedMatches,self.withCounts)
+
+    def output(self):
+        """
+        description:
+            gets the output of analyze from the summary
+        outputs:
+            top10matches - 10 unique matches with the highest score for the winning team
+            searchedMatches - every match that either resulted in the same score as score, or the next highest score
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        return [self.top10matches, self.searchedMatches]
+
+def summarizeShard(job):
+    """
+    description:
+        analyzes one shard of the matches, which is run by a worker process of analyzeParallel
+    input parameters:
+        job - a tuple of (shard,roster,score,withCounts,domain), where shard is a list of matches
+    outputs:
+        a PartialSummary of the shard
+    worst case space and time complexity:
+        time complexity - O(MN)
+        aux space complexity - O(N + MT)
+        where:
+            N is the number of matches in shard
+            M is the number of characters in each team
+            T is the number of unique teams
+    """
+    (shard,roster,score,withCounts,domain) = job
+    analysis = analyzeResults(shard,roster,domain)
+    return PartialSummary(analysis.top10(withCounts),analysis.matchesForScore(score,withCounts),withCounts)
+
+def analyzeParallel(results, roster, score, processes=None, withCounts=False, domain=None):
+    """
+    description:
+        a version of analyze that splits results into one shard per process, analyzes the shards in a process pool,
+        then merges the summaries of the shards into the same output as analyze
+    input parameters:
+        results - a list of matches between 2 teams represented as strings, and the resulting score for each match
+        roster - the number of possible characters that could show up in results
+        score - the score to search for in results
+        processes - the number of processes to use, or None to use every core
+        withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        domain - the ScoreDomain of the scores, or None for scores from 0 to 100
+    outputs:
+        top10matches - 10 unique matches with the highest score for the winning team
+        searchedMatches - every match that either resulted in the same score as score, or the next highest score
+    worst case space and time complexity:
+        time complexity - O(MN / P + PK)
+        aux space complexity - O(N + MT + PK)
+        where:
+            N is the number of matches in results
+            M is the number of characters in each team
+            T is the number of unique teams
+            P is the number of processes
+            K is the number of searched matches
+        explanation:
+            each process analyzes N / P matches at the same time, and the P summaries are merged afterwards
+    """
+    if(processes==None):
+        processes = os.cpu_count() or 1
+    shardSize = max(1,math.ceil(len(results) / processes))
+    jobs = [(results[i:i+shardSize],roster,score,withCounts,domain) for i in range(0,len(results),shardSize)]
+    if(len(jobs)<=1):
+        summaries = [summarizeShard(job) for job in jobs]
+    else:
+        with multiprocessing.Pool(len(jobs)) as pool:
+            summaries = pool.map(summarizeShard,jobs)
+    summary = PartialSummary([],[],withCounts)
+    for shardSummary in summaries:
+        summary = summary.merge(shardSummary)
+    return summary.output()
+
+def analyze(results, roster, score, processes=1, withCounts=False, domain=None):
     """
     description:
         function that finds the top 10 scores from a list of matches, along with a list of
@@ -277,6 +1643,10 @@ def analyze(results, roster, score):
             format: [(team1,team2,score),(team1,team2,score),...]
         roster - the number of possible characters that could show up in results (eg A, B, and C are possible when roster = 3)
         score - the score to search for in results
+        processes - the number of processes to split results across (see analyzeParallel), or None to use every core
+        withCounts - a boolean stating whether to add how many times each match occurred (inverses included),
+            in the format [team1,team2,score,count]
+        domain - the ScoreDomain of the scores, or None for scores from 0 to 100 where the inverse of a score is 100 - score
     outputs:
         top10matches - 10 unique matches with the highest score for the winning team
         searchedMatches - every match that either resulted in the same score as score, or the next highest score
@@ -287,34 +1657,966 @@ def analyze(results, roster, score):
             N is the number of matches in results
             M is the number of characters in each team
         explanation:
-            this algorithm conducts radix sort, which takes O(MN) time
-            and this algorithm creates duplicate arrays, which takes O(MN) space
-    """
-    top10matches = []
-    searchedMatches = [] 
-    # add all the inverses of each match to the results (aka team2 vs team1 instead of team1 vs team2)
-    startLen = len(results)
-    results += [[results[i][1], results[i][0], 100 - results[i][2]] for i in range(startLen)]
-    # ensure that every string in results is ordered alphabetically
-    for i in range(len(results)):
-        results[i][0] = alphabeticalOrder(results[i][0]) 
-        results[i][1] = alphabeticalOrder(results[i][1]) 
-    # radix sort results
-    results = radixSortResults(results)
-    # remove any duplicates
-    results = removeDuplicatesFromSorted(results,lambda x:x)
-    # get the top 10 matches
-    top10matches = results[-min(len(results),10):]
-    top10matches.reverse()
-    # get the index of the score (or the next highest score if not available)
-    scoreIndex, score = binarySearch(results,score,lambda x:x[2])
-    # if there are multiple matches with the searched score, find the rightmost item
-    while(scoreIndex<len(results)-1 and results[scoreIndex+1][2]==score):
-        scoreIndex += 1
-    # add every match equal to the score into the searchedMatches array
-    if(scoreIndex!=None):
-        while(scoreIndex>=0 and results[scoreIndex][2]==score):
-            searchedMatches.append(results[scoreIndex])
-            scoreIndex -= 1
+            this algorithm conducts radix sort on team ids, which takes O(MN) time including ordering the teams alphabetically,
+            and the unique matches that are output take O(MN) space
+    """
+    if(processes!=1):
+        return analyzeParallel(results, roster, score, processes, withCounts, domain)
+    analysis = analyzeResults(results, roster, domain)
     # return results
-    return [top10matches, searchedMatches]
\ No newline at end of file
+    return [analysis.top10(withCounts), analysis.matchesForScore(score,withCounts)]
+
+def analyzeBatch(jobs, withCounts=False, domain=None):
+    """
+    description:
+        function that analyzes many leagues at once, giving the same output as calling analyze on each league
+        the matches of every league are stored in the same columns and sorted together,
+        with the league being the most important key, so the setup and passes of the radix sort are shared by the whole batch
+    input parameters:
+        jobs - a list of (results,roster,score) tuples, one for each league, where results, roster and score are as in analyze
+        withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        domain - the ScoreDomain of the scores in every league, or None for scores from 0 to 100
+    outputs:
+        a list containing [top10matches, searchedMatches] for each league, in the same order as jobs
+    worst case space and time complexity:
+        time complexity - O(MN + L)
+        aux space complexity - O(N + MT + L)
+        where:
+            N is the total number of matches in every league
+            M is the number of characters in each team
+            T is the number of unique teams in every league
+            L is the number of leagues
+        explanation:
+            every match is encoded and hashed once, the teams are ranked once using the largest roster,
+            and the radix sort engine does at most 4 counting sorts on the unique keys of the whole batch
+    """
+    # store every league in the same columns, remembering which league each match came from
+    leagueOf = array("l")
+    for league in range(len(jobs)):
+        leagueOf.extend([league] * len(jobs[league][0]))
+    columns = ResultsColumns([match for job in jobs for match in job[0]],domain=domain)
+    matchCount = columns.matchCount
+    # collapse identical rows of each league into unique keys with counts
+    counts = {}
+    for i in range(len(columns)):
+        key = (leagueOf[i % matchCount],columns.scoreOf(i),columns.team1Of(i),columns.team2Of(i))
+        counts[key] = counts.get(key,0) + 1
+    keys = list(counts)
+    # radix sort the unique keys, with league being most important, followed by score, team1 and team2
+    ranks = rankTeams(columns.teamNames,max([job[1] for job in jobs],default=1))
+    teamCount = len(ranks)
+    keySpec = [SortKey(lambda key: key[0],"int",minValue=0,maxValue=max(0,len(jobs) - 1)),
+        SortKey(lambda key: key[1],"int",minValue=0,maxValue=columns.domain.maxKey),
+        SortKey(lambda key: ranks[key[2]],"int",True,0,teamCount - 1),
+        SortKey(lambda key: ranks[key[3]],"int",True,0,teamCount - 1)]
+    order = radixSortOrder(keys,keySpec)
+    # split the sorted keys into leagues and decode them
+    sortedResults = [[] for _ in range(len(jobs))]
+    sortedCounts = [[] for _ in range(len(jobs))]
+    for i in order:
+        (league,scoreKey,team1,team2) = keys[i]
+        sortedResults[league].append([columns.teamNames[team1],columns.teamNames[team2],columns.domain.fromKey(scoreKey)])
+        sortedCounts[league].append(counts[keys[i]])
+    output = []
+    for league in range(len(jobs)):
+        analysis = AnalysisResult(sortedResults[league],sortedCounts[league],columns.domain)
+        output.append([analysis.top10(withCounts),analysis.matchesForScore(jobs[league][2],withCounts)])
+    return output
+
+def topK(results, k, roster=26, domain=None):
+    """
+    description:
+        function that finds the k unique matches with the highest score, in the same order as the top 10 matches of analyze
+        the matches are bucketed by score first, and only the highest buckets are ordered and have duplicates removed
+        until k unique matches have been found. results is not modified
+    input parameters:
+        results - a list of matches between 2 teams represented as strings, and the resulting score for each match
+            format: [(team1,team2,score),(team1,team2,score),...]
+        k - the number of matches to find
+        roster - the number of possible characters that could show up in results
+        domain - the ScoreDomain of the scores, or None for scores from 0 to 100
+    outputs:
+        k unique matches with the highest score for the winning team
+    worst case space and time complexity:
+        time complexity - O(N + BM)
+        aux space complexity - O(N + BM)
+        where:
+            N is the number of matches in results
+            M is the number of characters in each team
+            B is the number of matches within the buckets that are needed to find k unique matches
+        explanation:
+            bucketing the matches (and their inverses) by score key and radix sorting the keys that occur takes O(N) time,
+            but only the B matches in the highest buckets are ordered alphabetically and sorted
+    """
+    if(domain==None):
+        domain = DEFAULT_SCORE_DOMAIN
+    # bucket the index of every match and inverse by score key, inverses being stored as negative indexes
+    buckets = {}
+    for i in range(len(results)):
+        buckets.setdefault(domain.toKey(results[i][2]),[]).append(i)
+        buckets.setdefault(domain.toKey(domain.inverseOf(results[i][2])),[]).append(-i-1)
+    topMatches = []
+    for key in radixSort(list(buckets),[SortKey(lambda x:x,"int",True,0,domain.maxKey)]):
+        if(len(topMatches)>=k):
+            break
+        score = domain.fromKey(key)
+        # create the canonical matches within this bucket, ordering every team of the bucket at once
+        rawTeams = []
+        for i in buckets[key]:
+            match = results[i] if i>=0 else results[-i-1]
+            rawTeams.append(match[0])
+            rawTeams.append(match[1])
+        ordered = alphabeticalOrderBulk(rawTeams,roster)
+        bucket = []
+        for j in range(len(buckets[key])):
+            if(buckets[key][j]>=0):
+                bucket.append([ordered[2*j],ordered[2*j+1],score])
+            else:
+                bucket.append([ordered[2*j+1],ordered[2*j],score])
+        # sort the bucket and remove any duplicates
+        bucket = removeDuplicatesFromSorted(radixSortResultsPacked(bucket,roster,domain),lambda x:x)
+        bucket.reverse()
+        topMatches += bucket[:k-len(topMatches)]
+    return topMatches
+
+def readResultsChunks(path,chunkSize,domain=None):
+    """
+    description:
+        a generator that reads matches from a CSV or JSONL file in chunks
+        CSV rows are team1,team2,score (a header is skipped if it is the first line), and JSONL lines are either
+        [team1,team2,score] lists or objects with team1, team2 and score keys. blank lines are skipped
+    input parameters:
+        path - the path to the file, which is read as JSONL if it ends with .jsonl or .json and CSV otherwise
+        chunkSize - the maximum number of matches in each chunk
+        domain - the ScoreDomain of the scores, or None for scores from 0 to 100
+    outputs:
+        lists of at most chunkSize matches in the format [team1,team2,score]
+        raises a ValueError with the line number if a line isn't a match with a score within domain
+    worst case space and time complexity:
+        time complexity - O(MN)
+        aux space complexity - O(M * chunkSize)
+        where:
+            N is the number of matches in the file
+            M is the number of characters in each team
+        explanation:
+            every line is read once, and only one chunk is kept in memory at a time
+    """
+    if(domain==None):
+        domain = DEFAULT_SCORE_DOMAIN
+    # scores with decimal places are read as floats, otherwise they have to be integers
+    scoreTypes = (int,) if domain.decimals==0 else (int,float)
+    isJson = path.endswith(".jsonl") or path.endswith(".json")
+    chunk = []
+    with open(path,newline="") as file:
+        if(isJson):
+            rows = enumerate(file,1)
+        else:
+            reader = csv.reader(file)
+            rows = ((reader.line_num,row) for row in reader)
+        for (lineNumber,row) in rows:
+            if(isJson):
+                if(not row.strip()):
+                    continue
+                try:
+                    row = json.loads(row)
+                except ValueError:
+                    raise ValueError("line %d of %s isn't valid JSON" % (lineNumber,path))
+                if(isinstance(row,dict)):
+                    row = [row.get("team1"),row.get("team2"),row.get("score")]
+                if(not isinstance(row,list) or len(row)!=3 or not isinstance(row[0],str) or not isinstance(row[1],str)):
+                    raise ValueError("line %d of %s isn't a match" % (lineNumber,path))
+                score = row[2]
+                if(type(score) not in scoreTypes):
+                    raise ValueError("line %d of %s has a score that isn't a number of the score domain" % (lineNumber,path))
+            else:
+                if(len(row)==0):
+                    continue
+                if(len(row)!=3):
+                    raise ValueError("line %d of %s doesn't have 3 fields" % (lineNumber,path))
+                try:
+                    score = scoreTypes[-1](row[2].strip())
+                except ValueError:
+                    if(lineNumber==1): # header row
+                        continue
+                    raise ValueError("line %d of %s has a score that isn't a number of the score domain" % (lineNumber,path))
+            # the score has to be within the domain, without more decimal places than the domain has
+            try:
+                key = domain.toKey(score)
+            except (ValueError,OverflowError):
+                raise ValueError("line %d of %s has a score outside of the score domain" % (lineNumber,path))
+            if(domain.fromKey(key)!=score):
+                raise ValueError("line %d of %s has a score with too many decimal places" % (lineNumber,path))
+            chunk.append([row[0].strip(),row[1].strip(),domain.fromKey(key)])
+            if(len(chunk)==chunkSize):
+                yield chunk
+                chunk = []
+    if(len(chunk)>0):
+        yield chunk
+
+def readRun(path,domain):
+    """
+    description:
+        a generator that reads back a sorted run written by analyzeFile, where scores are stored as their keys
+    input parameters:
+        path - the path to the run
+        domain - the ScoreDomain of the scores
+    outputs:
+        matches in the format [team1,team2,score], with the highest score first
+    worst case space and time complexity:
+        time complexity - O(MN)
+        aux space complexity - O(M)
+        where:
+            N is the number of matches in the run
+            M is the number of characters in each team
+        explanation:
+            only a single line is held at a time
+    """
+    with open(path) as file:
+        for line in file:
+            (team1,team2,key) = line.split(",")
+            yield [team1,team2,domain.fromKey(int(key))]
+
+def analyzeFile(path, roster, score, chunkSize=100000, tempDir=None, domain=None):
+    """
+    description:
+        an out-of-core version of analyze for results files that don't fit in memory
+        each chunk of the file is analyzed on its own and spilled to a temporary file as a sorted run,
+        then the runs are k-way merged (highest score first) while removing duplicates
+    input parameters:
+        path - a CSV or JSONL results file (see readResultsChunks)
+        roster - the number of possible characters that could show up in results
+        score - the score to search for in results
+        chunkSize - the maximum number of matches that are analyzed in memory at once
+        tempDir - the directory to put the sorted runs in, or None for the default temporary directory
+        domain - the ScoreDomain of the scores, or None for scores from 0 to 100
+    outputs:
+        top10matches - 10 unique matches with the highest score for the winning team
+        searchedMatches - every match that either resulted in the same score as score, or the next highest score
+    worst case space and time complexity:
+        time complexity - O(MN + MN log(R))
+        aux space complexity - O(M * chunkSize + MR + MK)
+        where:
+            N is the number of matches in the file
+            M is the number of characters in each team
+            R is the number of runs, which is N / chunkSize rounded up
+            K is the number of searched matches
+        explanation:
+            every chunk is radix sorted in O(M * chunkSize) time and memory, then merging the runs
+            takes O(log(R)) comparisons per match, while only one match per run is held in memory
+    """
+    if(domain==None):
+        domain = DEFAULT_SCORE_DOMAIN
+    with tempfile.TemporaryDirectory(dir=tempDir) as runDir:
+        # sort each chunk and spill it with the highest score first, storing scores as their keys so decimals are kept exactly
+        runPaths = []
+        for chunk in readResultsChunks(path,chunkSize,domain):
+            sortedChunk = analyzeResults(chunk,roster,domain).sortedResults
+            runPath = os.path.join(runDir,"run%d.csv" % len(runPaths))
+            with open(runPath,"w") as file:
+                for i in range(len(sortedChunk)-1,-1,-1):
+                    file.write("%s,%s,%d\n" % (sortedChunk[i][0],sortedChunk[i][1],domain.toKey(sortedChunk[i][2])))
+            runPaths.append(runPath)
+        top10matches = []
+        searchedMatches = []
+        searchedScore = None
+        # merge the runs in the same order as the top 10 matches, skipping duplicates
+        previous = None
+        runs = [readRun(runPath,domain) for runPath in runPaths]
+        for match in heapq.merge(*runs,key=lambda x:(-x[2],x[0],x[1])):
+            if(match==previous):
+                continue
+            previous = match
+            if(len(top10matches)<10):
+                top10matches.append(match)
+            if(match[2]>=score):
+                # the searched score is the lowest score that is at least score
+                if(match[2]!=searchedScore):
+                    searchedScore = match[2]
+                    searchedMatches = []
+                searchedMatches.append(match)
+            elif(len(top10matches)==10):
+                break
+        # close the runs so that they can be deleted
+        for run in runs:
+            run.close()
+    return [top10matches, searchedMatches]
+
+class IncrementalAnalyzer:
+    def __init__(self,roster,domain=None):
+        """
+        description:
+            an analyzer that keeps the canonical, deduplicated matches (inverses included) grouped by score
+            as matches arrive, so that the outputs of analyze can be read at any time without re-sorting
+        input parameters:
+            roster - the number of possible characters that could show up in the teams
+            domain - the ScoreDomain of the scores, or None for scores from 0 to 100
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+            explanation:
+                score groups are only created for the scores that occur
+        """
+        self.roster = roster
+        self.domain = DEFAULT_SCORE_DOMAIN if domain==None else domain
+        self.matchSet = set() # every canonical (team1,team2,score key) that has been ingested
+        self.scoreGroups = {} # score key to a sorted list of (team1,team2), for every score key with matches
+        self.groupKeys = [] # the keys of scoreGroups in ascending order
+
+    def __len__(self):
+        """
+        description:
+            gets the number of unique canonical matches (inverses included)
+        outputs:
+            the number of unique canonical matches
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        return len(self.matchSet)
+
+    def orderTeam(self,team):
+        """
+        description:
+            orders a team alphabetically, after checking that every letter is within the roster
+        input parameters:
+            team - a team, which doesn't have to be ordered alphabetically
+        outputs:
+            the alphabetically ordered team, or a ValueError if a letter is outside of the roster
+        worst case space and time complexity:
+            time complexity - O(M)
+            aux space complexity - O(M)
+            where:
+                M is the number of characters in the team
+        """
+        lastLetter = chr(64 + self.roster)
+        for letter in team:
+            if(letter<"A" or letter>lastLetter):
+                raise ValueError("team %s has a letter outside of the roster" % team)
+        return alphabeticalOrder(team)
+
+    def addCanonical(self,team1,team2,score):
+        """
+        description:
+            adds a match whose teams are already in alphabetical order, ignoring it if it is a duplicate
+        input parameters:
+            team1 - an alphabetically ordered team
+            team2 - an alphabetically ordered team
+            score - the score of team1 against team2
+        outputs:
+            a boolean stating whether the match was new
+        worst case space and time complexity:
+            time complexity - O(M + G + D)
+            aux space complexity - O(M)
+            where:
+                M is the number of characters in each team
+                G is the number of unique matches with the same score
+                D is the number of distinct scores
+            explanation:
+                the duplicate check hashes the teams in O(M), and inserting into the score group
+                binary searches in O(M log(G)) and then shifts at most G references
+                (a new score also shifts at most D keys)
+        """
+        scoreKey = self.domain.toKey(score)
+        key = (team1,team2,scoreKey)
+        if(key in self.matchSet):
+            return False
+        self.matchSet.add(key)
+        if(scoreKey not in self.scoreGroups):
+            self.scoreGroups[scoreKey] = []
+            bisect.insort(self.groupKeys,scoreKey)
+        bisect.insort(self.scoreGroups[scoreKey],(team1,team2))
+        return True
+
+    def ingest(self,match):
+        """
+        description:
+            adds a single match (and its inverse) to the analyzer
+        input parameters:
+            match - a match in the format (team1,team2,score)
+        outputs:
+            raises a ValueError (without adding the match) if a team has a letter outside of the roster
+        worst case space and time complexity:
+            time complexity - O(M + G + D)
+            aux space complexity - O(M)
+            where:
+                M is the number of characters in each team
+                G is the number of unique matches with the same score
+                D is the number of distinct scores
+            explanation:
+                both teams are ordered alphabetically in O(M), then two canonical matches are added
+        """
+        team1 = self.orderTeam(match[0])
+        team2 = self.orderTeam(match[1])
+        self.addCanonical(team1,team2,match[2])
+        self.addCanonical(team2,team1,self.domain.inverseOf(match[2]))
+
+    def ingestMany(self,batch):
+        """
+        description:
+            adds every match within a batch to the analyzer
+        input parameters:
+            batch - a list of matches in the format (team1,team2,score)
+        worst case space and time complexity:
+            time complexity - O(B(M + G + D))
+            aux space complexity - O(BM)
+            where:
+                B is the number of matches in batch
+                M is the number of characters in each team
+                G is the number of unique matches with the same score
+                D is the number of distinct scores
+            explanation:
+                ingest is called once for each match
+        """
+        for match in batch:
+            self.ingest(match)
+
+    def top10(self):
+        """
+        description:
+            gets the same top 10 matches that analyze would return for every ingested match
+        outputs:
+            10 unique matches with the highest score for the winning team
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+            explanation:
+                every score group has matches, so at most 10 score groups are checked and at most 10 matches are copied
+        """
+        top10matches = []
+        for i in range(len(self.groupKeys)-1,-1,-1):
+            score = self.domain.fromKey(self.groupKeys[i])
+            for (team1,team2) in self.scoreGroups[self.groupKeys[i]]:
+                if(len(top10matches)==10):
+                    return top10matches
+                top10matches.append([team1,team2,score])
+        return top10matches
+
+    def matchesForScore(self,score):
+        """
+        description:
+            gets the same searched matches that analyze would return for every ingested match
+        input parameters:
+            score - the score to search for
+        outputs:
+            every match that either resulted in the same score as score, or the next highest score
+        worst case space and time complexity:
+            time complexity - O(log(D) + K)
+            aux space complexity - O(K)
+            where:
+                D is the number of distinct scores
+                K is the number of matches returned
+            explanation:
+                the score keys are binary searched before the matching group is copied
+        """
+        i = bisect.bisect_left(self.groupKeys,self.domain.ceilKey(score))
+        if(i==len(self.groupKeys)):
+            return []
+        found = self.domain.fromKey(self.groupKeys[i])
+        return [[team1,team2,found] for (team1,team2) in self.scoreGroups[self.groupKeys[i]]]
+
+    def query(self,score):
+        """
+        description:
+            gets the output of analyze for every ingested match
+        input parameters:
+            score - the score to search for
+        outputs:
+            top10matches - 10 unique matches with the highest score for the winning team
+            searchedMatches - every match that either resulted in the same score as score, or the next highest score
+        worst case space and time complexity:
+            time complexity - O(log(D) + K)
+            aux space complexity - O(K)
+            where:
+                D is the number of distinct scores
+                K is the number of searched matches
+        """
+        return [self.top10(), self.matchesForScore(score)]
+
+class WindowedAnalyzer(IncrementalAnalyzer):
+    def __init__(self,roster,windowSize=None,windowTime=None,domain=None):
+        """
+        description:
+            an IncrementalAnalyzer over a sliding window of matches, which either holds the last windowSize matches
+            or the matches within windowTime of the latest timestamp. how many times each canonical match is in the window
+            is counted, so a match is only removed once every copy of it has expired
+        input parameters:
+            roster - the number of possible characters that could show up in the teams
+            windowSize - the maximum number of matches in the window, or None for no limit
+            windowTime - the span of timestamps (eg days) that the window covers, or None for no limit
+            domain - the ScoreDomain of the scores, or None for scores from 0 to 100
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        super().__init__(roster,domain)
+        self.windowSize = windowSize
+        self.windowTime = windowTime
+        self.window = deque() # (team1,team2,score,timestamp) of each match in the window, oldest first
+        self.matchCounts = {} # canonical (team1,team2,score key) to the number of times it is in the window
+
+    def addCanonical(self,team1,team2,score):
+        """
+        description:
+            adds a copy of a match whose teams are already in alphabetical order
+        input parameters:
+            team1 - an alphabetically ordered team
+            team2 - an alphabetically ordered team
+            score - the score of team1 against team2
+        outputs:
+            a boolean stating whether the match wasn't already in the window
+        worst case space and time complexity:
+            time complexity - O(M + G + D)
+            aux space complexity - O(M)
+            where:
+                M is the number of characters in each team
+                G is the number of unique matches with the same score
+                D is the number of distinct scores
+            explanation:
+                O(M log(G)) time is spent binary searching, and at most G references (and D keys) are shifted
+        """
+        key = (team1,team2,self.domain.toKey(score))
+        self.matchCounts[key] = self.matchCounts.get(key,0) + 1
+        return super().addCanonical(team1,team2,score)
+
+    def removeCanonical(self,team1,team2,score):
+        """
+        description:
+            removes a copy of a match whose teams are already in alphabetical order,
+            removing the match itself once there are no copies left
+        input parameters:
+            team1 - an alphabetically ordered team
+            team2 - an alphabetically ordered team
+            score - the score of team1 against team2
+        worst case space and time complexity:
+            time complexity - O(M + G + D)
+            aux space complexity - O(1)
+            where:
+                M is the number of characters in each team
+                G is the number of unique matches with the same score
+                D is the number of distinct scores
+            explanation:
+                O(M log(G)) time is spent binary searching, and at most G references (and D keys) are shifted
+        """
+        scoreKey = self.domain.toKey(score)
+        key = (team1,team2,scoreKey)
+        self.matchCounts[key] -= 1
+        if(self.matchCounts[key]==0):
+            del self.matchCounts[key]
+            self.matchSet.remove(key)
+            group = self.scoreGroups[scoreKey]
+            del group[bisect.bisect_left(group,(team1,team2))]
+            # remove the score group once it is empty, so that every score group has matches
+            if(len(group)==0):
+                del self.scoreGroups[scoreKey]
+                del self.groupKeys[bisect.bisect_left(self.groupKeys,scoreKey)]
+
+    def ingest(self,match,timestamp=None):
+        """
+        description:
+            adds a match (and its inverse) to the window, then expires the matches that are outside of the window
+        input parameters:
+            match - a match in the format (team1,team2,score)
+            timestamp - when the match happened, which can't be earlier than the previous match (only needed if windowTime is used)
+        outputs:
+            raises a ValueError (without adding the match) if windowTime is used and there is no timestamp,
+            or if a team has a letter outside of the roster
+        worst case space and time complexity:
+            time complexity - O(E(M + G + D))
+            aux space complexity - O(M)
+            where:
+                E is the number of matches added and expired, which is 2 when the window is full
+                M is the number of characters in each team
+                G is the number of unique matches with the same score
+                D is the number of distinct scores
+        """
+        if(self.windowTime!=None and timestamp==None):
+            raise ValueError("a timestamp is needed when windowTime is used")
+        team1 = self.orderTeam(match[0])
+        team2 = self.orderTeam(match[1])
+        self.addCanonical(team1,team2,match[2])
+        self.addCanonical(team2,team1,self.domain.inverseOf(match[2]))
+        self.window.append((team1,team2,match[2],timestamp))
+        self.expire(timestamp)
+
+    def expire(self,now=None):
+        """
+        description:
+            removes the oldest matches until the window holds at most windowSize matches,
+            and every match is within windowTime of now
+        input parameters:
+            now - the current timestamp, or None to only expire by windowSize
+        worst case space and time complexity:
+            time complexity - O(E(M + G + D))
+            aux space complexity - O(1)
+            where:
+                E is the number of matches expired
+                M is the number of characters in each team
+                G is the number of unique matches with the same score
+                D is the number of distinct scores
+        """
+        while(len(self.window)>0 and ((self.windowSize!=None and len(self.window)>self.windowSize)
+                or (self.windowTime!=None and now!=None and self.window[0][3]<=now - self.windowTime))):
+            (team1,team2,score,timestamp) = self.window.popleft()
+            self.removeCanonical(team1,team2,score)
+            self.removeCanonical(team2,team1,self.domain.inverseOf(score))
+
+# the layout of a results index file, where every number is little endian:
+#   header - magic, version, roster, number of matches, number of teams
+#   score offsets - 102 offsets, where the matches with score s are from offset s up to offset s + 1
+#   matches - team1 id, team2 id, score, count (in the order given by radixSortResults)
+#   team offsets - number of teams + 1 offsets into the team names
+#   team names - every alphabetically ordered team as ascii
+INDEX_MAGIC = b"FIT2004R"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<8sIIII")
+INDEX_SCORE_OFFSETS = struct.Struct("<102I")
+INDEX_MATCH = struct.Struct("<IIHI")
+
+def writeResultsIndex(path,analysis,roster):
+    """
+    description:
+        persists an AnalysisResult (with counts) to a compact binary file that can be opened with ResultsIndex
+    input parameters:
+        path - the path of the file to write
+        analysis - an AnalysisResult with counts, whose scores are from 0 to 100
+        roster - the number of possible characters that could show up in the teams
+    worst case space and time complexity:
+        time complexity - O(MU)
+        aux space complexity - O(MT)
+        where:
+            U is the number of unique matches
+            M is the number of characters in each team
+            T is the number of unique teams
+        explanation:
+            every match is written once, and only the team ids are kept in memory
+    """
+    domain = analysis.domain
+    if(domain.maxKey!=DEFAULT_SCORE_DOMAIN.maxKey or domain.decimals!=0 or domain.inverse!=None):
+        raise ValueError("only scores from 0 to 100 can be written to a results index")
+    teamIds = {}
+    teamNames = []
+    with open(path,"wb") as file:
+        file.write(INDEX_HEADER.pack(INDEX_MAGIC,INDEX_VERSION,roster,len(analysis),0)) # the number of teams is written at the end
+        file.write(INDEX_SCORE_OFFSETS.pack(*analysis.scoreStart))
+        for i in range(len(analysis)):
+            (team1,team2,score) = analysis.sortedResults[i]
+            for team in [team1,team2]:
+                if(team not in teamIds):
+                    teamIds[team] = len(teamNames)
+                    teamNames.append(team)
+            file.write(INDEX_MATCH.pack(teamIds[team1],teamIds[team2],score,analysis.counts[i]))
+        # write the team names after their offsets
+        teamOffsets = [0] * (len(teamNames) + 1)
+        for i in range(len(teamNames)):
+            teamOffsets[i+1] = teamOffsets[i] + len(teamNames[i])
+        file.write(struct.pack("<%dI" % len(teamOffsets),*teamOffsets))
+        file.write("".join(teamNames).encode("ascii"))
+        file.seek(0)
+        file.write(INDEX_HEADER.pack(INDEX_MAGIC,INDEX_VERSION,roster,len(analysis),len(teamNames)))
+
+def buildResultsIndex(results,roster,path):
+    """
+    description:
+        analyzes results and persists the output to a results index file
+    input parameters:
+        results - a list of matches between 2 teams represented as strings, and the resulting score for each match
+        roster - the number of possible characters that could show up in results
+        path - the path of the file to write
+    outputs:
+        a ResultsIndex of the file
+    worst case space and time complexity:
+        time complexity - O(MN)
+        aux space complexity - O(N + MT)
+        where:
+            N is the number of matches in results
+            M is the number of characters in each team
+            T is the number of unique teams
+    """
+    writeResultsIndex(path,analyzeResults(results,roster),roster)
+    return ResultsIndex(path)
+
+class ResultsIndex:
+    def __init__(self,path):
+        """
+        description:
+            a results index file opened with mmap, which answers the same queries as an AnalysisResult
+            by reading only the matches that are needed. new matches are appended to a delta file (path + ".delta"),
+            which is analyzed when it is queried and merged into the index file by compact
+            the file layout has an offset for each score from 0 to 100, so other score domains aren't supported
+        input parameters:
+            path - the path of a file written by writeResultsIndex
+        worst case space and time complexity:
+            time complexity - O(MT)
+            aux space complexity - O(MT)
+            where:
+                M is the number of characters in each team
+                T is the number of unique teams
+            explanation:
+                only the team names are read, the matches stay on disk until they are needed
+        """
+        self.path = path
+        self.deltaPath = path + ".delta"
+        self.compactingPath = path + ".compacting" # the delta file while it is being merged by compact
+        self.deltaSize = None # size of the delta file when it was last analyzed
+        self.delta = None # AnalysisResult of the delta file
+        self.recover()
+        self.open()
+
+    def recover(self):
+        """
+        description:
+            finishes a compact that was interrupted after the merged index file was written.
+            the delta file is only moved to compactingPath once path + ".tmp" holds the merged matches,
+            so if compactingPath exists, the merged file is moved into place (unless that already happened)
+            and the old delta file is removed, which means the delta file is never merged twice
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        if(os.path.exists(self.compactingPath)):
+            if(os.path.exists(self.path + ".tmp")):
+                os.replace(self.path + ".tmp",self.path)
+            os.remove(self.compactingPath)
+
+    def open(self):
+        """
+        description:
+            maps the index file into memory and reads its header, score offsets and team names
+        worst case space and time complexity:
+            time complexity - O(MT)
+            aux space complexity - O(MT)
+            where:
+                M is the number of characters in each team
+                T is the number of unique teams
+        """
+        with open(self.path,"rb") as file:
+            self.data = mmap.mmap(file.fileno(),0,access=mmap.ACCESS_READ)
+        (magic,version,self.roster,self.matchCount,teamCount) = INDEX_HEADER.unpack_from(self.data,0)
+        if(magic!=INDEX_MAGIC or version!=INDEX_VERSION):
+            self.data.close()
+            raise ValueError("%s is not a results index" % self.path)
+        self.scoreStart = INDEX_SCORE_OFFSETS.unpack_from(self.data,INDEX_HEADER.size)
+        self.matchesOffset = INDEX_HEADER.size + INDEX_SCORE_OFFSETS.size
+        teamOffsetsOffset = self.matchesOffset + INDEX_MATCH.size * self.matchCount
+        teamOffsets = struct.unpack_from("<%dI" % (teamCount + 1),self.data,teamOffsetsOffset)
+        namesOffset = teamOffsetsOffset + 4 * (teamCount + 1)
+        names = self.data[namesOffset:namesOffset + teamOffsets[-1]].decode("ascii")
+        self.teamNames = [names[teamOffsets[i]:teamOffsets[i+1]] for i in range(teamCount)]
+
+    def close(self):
+        """
+        description:
+            unmaps the index file
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        self.data.close()
+
+    def __len__(self):
+        """
+        description:
+            gets the number of unique canonical matches in the index file (not including the delta file)
+        outputs:
+            the number of unique canonical matches
+        worst case space and time complexity:
+            time complexity - O(1)
+            aux space complexity - O(1)
+        """
+        return self.matchCount
+
+    def getMatches(self,start,end):
+        """
+        description:
+            reads the matches from start up to (but not including) end from the index file, in reverse order
+        input parameters:
+            start - the index of the first match
+            end - the index after the last match
+        outputs:
+            a list of matches in the format [team1,team2,score,count]
+        worst case space and time complexity:
+            time complexity - O(1 + K)
+            aux space complexity - O(K)
+            where:
+                K is the number of matches returned
+        """
+        matches = []
+        for i in range(end-1,start-1,-1):
+            (team1,team2,score,count) = INDEX_MATCH.unpack_from(self.data,self.matchesOffset + INDEX_MATCH.size * i)
+            matches.append([self.teamNames[team1],self.teamNames[team2],score,count])
+        return matches
+
+    def appendMatches(self,matches):
+        """
+        description:
+            appends matches to the delta file, which is merged into queries until compact is called
+        input parameters:
+            matches - a list of matches in the format (team1,team2,score)
+        outputs:
+            raises a ValueError (without appending any match) if a score isn't an integer from 0 to 100
+        worst case space and time complexity:
+            time complexity - O(MK)
+            aux space complexity - O(1)
+            where:
+                K is the number of matches
+                M is the number of characters in each team
+        """
+        # a results index only holds scores from 0 to 100
+        for (team1,team2,score) in matches:
+            if(score!=DEFAULT_SCORE_DOMAIN.toKey(score)):
+                raise ValueError("score %s is outside of the score domain" % score)
+        with open(self.deltaPath,"a") as file:
+            for (team1,team2,score) in matches:
+                file.write("%s,%s,%d\n" % (team1,team2,score))
+
+    def loadDelta(self):
+        """
+        description:
+            analyzes the delta file if it has changed since it was last analyzed
+        outputs:
+            an AnalysisResult of the delta file, or None if there is no delta file
+        worst case space and time complexity:
+            time complexity - O(MD)
+            aux space complexity - O(MD)
+            where:
+                D is the number of matches in the delta file
+                M is the number of characters in each team
+        """
+        size = os.path.getsize(self.deltaPath) if os.path.exists(self.deltaPath) else None
+        if(size!=self.deltaSize):
+            self.deltaSize = size
+            self.delta = None
+            if(size!=None):
+                matches = []
+                for chunk in readResultsChunks(self.deltaPath,100000):
+                    matches += chunk
+                self.delta = analyzeResults(matches,self.roster)
+        return self.delta
+
+    def scoreRange(self,lo,hi,withCounts=False):
+        """
+        description:
+            gets every match with a score from lo to hi (inclusive), with the highest score first
+            and matches with the same score in alphabetical order
+        input parameters:
+            lo - the smallest score to include
+            hi - the largest score to include
+            withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        outputs:
+            a list of matches
+        worst case space and time complexity:
+            time complexity - O(1 + K + MD)
+            aux space complexity - O(K + MD)
+            where:
+                K is the number of matches returned
+                D is the number of matches in the delta file
+                M is the number of characters in each team
+        """
+        lo = max(0,math.ceil(lo))
+        hi = min(100,math.floor(hi))
+        if(lo>hi):
+            return []
+        matches = self.getMatches(self.scoreStart[lo],self.scoreStart[hi+1])
+        delta = self.loadDelta()
+        if(delta!=None):
+            matches = mergeSortedUnique(matches,delta.scoreRange(lo,hi,True),lambda x:(-x[2],x[0],x[1]),None,addCounts)
+        return matches if withCounts else [match[:3] for match in matches]
+
+    def summary(self,score):
+        """
+        description:
+            summarizes the index file and the delta file for a score
+        input parameters:
+            score - the score to search for
+        outputs:
+            a PartialSummary (with counts) of every match
+        worst case space and time complexity:
+            time complexity - O(1 + K + MD)
+            aux space complexity - O(K + MD)
+            where:
+                K is the number of searched matches
+                D is the number of matches in the delta file
+                M is the number of characters in each team
+        """
+        top10matches = self.getMatches(max(0,self.matchCount-10),self.matchCount)
+        searchedMatches = []
+        if(score<=100):
+            # find the smallest score at least score that has any matches
+            for s in range(max(0,math.ceil(score)),101):
+                if(self.scoreStart[s+1]>self.scoreStart[s]):
+                    searchedMatches = self.getMatches(self.scoreStart[s],self.scoreStart[s+1])
+                    break
+        summary = PartialSummary(top10matches,searchedMatches,True)
+        delta = self.loadDelta()
+        if(delta!=None):
+            summary = summary.merge(PartialSummary(delta.top10(True),delta.matchesForScore(score,True),True))
+        return summary
+
+    def top10(self,withCounts=False):
+        """
+        description:
+            gets the 10 unique matches with the highest score
+        input parameters:
+            withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        outputs:
+            10 unique matches with the highest score for the winning team
+        worst case space and time complexity:
+            time complexity - O(MD)
+            aux space complexity - O(MD)
+            where:
+                D is the number of matches in the delta file
+                M is the number of characters in each team
+        """
+        matches = self.summary(101).top10matches
+        return matches if withCounts else [match[:3] for match in matches]
+
+    def matchesForScore(self,score,withCounts=False):
+        """
+        description:
+            gets every match with a particular score, or with the next highest score if there are none
+        input parameters:
+            score - the score to search for
+            withCounts - a boolean stating whether to add how many times each match occurred, as [team1,team2,score,count]
+        outputs:
+            every match that either resulted in the same score as score, or the next highest score
+        worst case space and time complexity:
+            time complexity - O(1 + K + MD)
+            aux space complexity - O(K + MD)
+            where:
+                K is the number of matches returned
+                D is the number of matches in the delta file
+                M is the number of characters in each team
+        """
+        matches = self.summary(score).searchedMatches
+        return matches if withCounts else [match[:3] for match in matches]
+
+    def compact(self):
+        """
+        description:
+            merges the delta file into the index file, then removes the delta file.
+            if this is interrupted, the next ResultsIndex opened on the path either finishes it or keeps the old files
+        worst case space and time complexity:
+            time complexity - O(M(U + D))
+            aux space complexity - O(M(U + D))
+            where:
+                U is the number of unique matches in the index file
+                D is the number of matches in the delta file
+                M is the number of characters in each team
+        """
+        delta = self.loadDelta()
+        if(delta==None):
+            return
+        merged = mergeSortedUnique(self.getMatches(0,self.matchCount),delta.getMatches(0,len(delta),True),
+            lambda x:(-x[2],x[0],x[1]),None,addCounts)
+        merged.reverse()
+        analysis = AnalysisResult([match[:3] for match in merged],[match[3] for match in merged])
+        self.close()
+        # write to a temporary file first so the index is never left half written
+        writeResultsIndex(self.path + ".tmp",analysis,self.roster)
+        # move the delta file aside before replacing the index file, so recover can finish the compact after a crash
+        os.replace(self.deltaPath,self.compactingPath)
+        os.replace(self.path + ".tmp",self.path)
+        os.remove(self.compactingPath)
+        self.deltaSize = None
+        self.delta = None
+        self.open()
\ No newline at end of file
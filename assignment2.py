@@ -2,6 +2,15 @@
 Assignment 2 FIT2004
 By: Mario Susanto
 """
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import heapq
+import multiprocessing
+import struct
+import sys
+import threading
 
 class MinHeap:
     def __init__(self,maxLen,getVal = lambda x:x, getHeapIndex = lambda x:0, setHeapIndex = lambda x,y:0):
@@ -75,9 +84,8 @@ class MinHeap:
         :Aux space complexity:
             O(1)
         """
-        parentIndex = index//2
-        if(parentIndex!=index):
-            return parentIndex 
+        if(index>0):
+            return (index-1)//2 
         else:
             return None
     def smallestChild(self,index):
@@ -223,32 +231,706 @@ class MinHeap:
         """
         return len(self) > 0
 
-class DjikData():
-    def __init__(self):
+class DjikState():
+    def __init__(self,vertexCount):
         """
-        Instantiates the DjikData class, which stores information relevant to djikstra for a vertex
+        Instantiates the DjikState class, which stores the information relevant to djikstra for every vertex during one search
+        the arrays are reused by later searches, where a vertex only has data from the current search
+        if its stamp is the current generation, so starting a new search doesn't need to clear every vertex
+        :Input:
+            vertexCount:
+                the number of vertexes in the graph
+        :Time complexity:
+            O(V) where V is the number of vertexes
+        :Aux space complexity:
+            O(V) where V is the number of vertexes
+        """
+        self.dist = [float('inf')] * vertexCount # distance from the start vertex of djikstra
+        self.prev = [None] * vertexCount # previous vertex
+        self.heapIndex = [None] * vertexCount # position of the vertex within the heap
+        self.stamp = array("q",[0]) * vertexCount # the generation in which the vertex was discovered
+        self.generation = 0 # the current search
+        self.source = None # the start vertex of the current search
+        self.useOpp = False # whether the current search uses incoming edges
+        def setHeapIndex(u,val): # function for setting the heap index, passed as an argument into MinHeap, O(1) time and aux space complexity
+            self.heapIndex[u] = val
+        self.heap = MinHeap(vertexCount,lambda u: self.dist[u],lambda u: self.heapIndex[u],setHeapIndex)
+
+    def reset(self,source,useOpp):
+        """
+        starts a new search, which makes every vertex undiscovered
+        :Input:
+            source:
+                the start vertex of the search
+            useOpp:
+                whether the search uses incoming edges
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        self.generation += 1
+        self.source = source
+        self.useOpp = useOpp
+        self.heap.dataLen = 0
+
+    def discover(self,u):
+        """
+        marks a vertex as discovered in the current search
+        :Input:
+            u:
+                an integer representing the vertex
         :Time complexity:
             O(1)
         :Aux space complexity:
             O(1)
         """
-        self.dist = float('inf') # distance from the start vertex of djikstra
-        self.prev = None # previous vertex
-        self.discovered = False # has this vertex been discovered by a neighbouring vertex?
-        self.heapIndex = None # position of the vertex within the heap
+        self.stamp[u] = self.generation
+        self.dist[u] = float('inf')
+        self.prev[u] = None
 
-class TopoData():
-    def __init__(self):
+    def isDiscovered(self,u):
         """
-        Instantiates the TopoData class, which stores information relevant to djikstra for a vertex
+        finds if a vertex has been discovered in the current search
+        :Input:
+            u:
+                an integer representing the vertex
+        :Output, return or postcondition:
+            a boolean representing if the vertex has been discovered
         :Time complexity:
             O(1)
         :Aux space complexity:
             O(1)
         """
-        self.visited = False # has this vertex been visited?
-        self.score = -float('inf') # score when going from the start to here
-        self.prev = None 
+        return self.stamp[u]==self.generation
+
+    def distOf(self,u):
+        """
+        gets the distance from the start vertex to a vertex
+        :Input:
+            u:
+                an integer representing the vertex
+        :Output, return or postcondition:
+            the distance, or infinity if the vertex can't be reached
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        return self.dist[u] if self.isDiscovered(u) else float('inf')
+
+    def prevOf(self,u):
+        """
+        gets the previous vertex of a vertex on its shortest path from the start vertex
+        :Input:
+            u:
+                an integer representing the vertex
+        :Output, return or postcondition:
+            an integer representing the previous vertex, or None if there is none
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        return self.prev[u] if self.isDiscovered(u) else None
+
+class PathTree():
+    def __init__(self,state=None,vertexCount=0):
+        """
+        Instantiates the PathTree class, which is a compact copy of the result of a djikstra that can be kept after the search
+        :Input:
+            state:
+                the DjikState of a finished djikstra, or None to create a tree where no vertex can be reached (eg to read from a file)
+            vertexCount:
+                the number of vertexes if state is None
+        :Time complexity:
+            O(V) where V is the number of vertexes
+        :Aux space complexity:
+            O(V) where V is the number of vertexes
+        """
+        if(state!=None):
+            vertexCount = len(state.dist)
+        self.source = None if state==None else state.source
+        self.useOpp = False if state==None else state.useOpp
+        self.dist = array("d",[float('inf')]) * vertexCount # distance from the source
+        self.prev = array("q",[-1]) * vertexCount # previous vertex, or -1 if there is none
+        if(state==None):
+            return
+        for u in range(vertexCount):
+            if(state.isDiscovered(u)):
+                self.dist[u] = state.dist[u]
+                if(state.prev[u]!=None):
+                    self.prev[u] = state.prev[u]
+
+    def distOf(self,u):
+        """
+        gets the distance from the source to a vertex
+        :Input:
+            u:
+                an integer representing the vertex
+        :Output, return or postcondition:
+            the distance, or infinity if the vertex can't be reached
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        return self.dist[u]
+
+    def prevOf(self,u):
+        """
+        gets the previous vertex of a vertex on its shortest path from the source
+        :Input:
+            u:
+                an integer representing the vertex
+        :Output, return or postcondition:
+            an integer representing the previous vertex, or None if there is none
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        return None if self.prev[u]==-1 else self.prev[u]
+
+    def isDiscovered(self,u):
+        """
+        finds if a vertex can be reached from the source
+        :Input:
+            u:
+                an integer representing the vertex
+        :Output, return or postcondition:
+            a boolean representing if the vertex can be reached
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        return self.dist[u]!=float('inf')
+
+    def nbytes(self):
+        """
+        gets the number of bytes used by the arrays of the tree
+        :Output, return or postcondition:
+            the number of bytes
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        return len(self.dist) * self.dist.itemsize + len(self.prev) * self.prev.itemsize
+
+    def writeTo(self,file):
+        """
+        writes the arrays of the tree to a binary file in little endian order
+        :Input:
+            file:
+                a file opened for writing in binary mode
+        :Time complexity:
+            O(V) where V is the number of vertexes
+        :Aux space complexity:
+            O(V) where V is the number of vertexes
+        """
+        for values in [self.dist,self.prev]:
+            if(sys.byteorder=="big"):
+                values = array(values.typecode,values)
+                values.byteswap()
+            values.tofile(file)
+
+    def readFrom(self,file):
+        """
+        reads the arrays of the tree from a binary file written by writeTo, replacing the current arrays
+        :Input:
+            file:
+                a file opened for reading in binary mode
+        :Time complexity:
+            O(V) where V is the number of vertexes
+        :Aux space complexity:
+            O(V) where V is the number of vertexes
+        """
+        vertexCount = len(self.dist)
+        for name in ["dist","prev"]:
+            values = array(getattr(self,name).typecode)
+            values.fromfile(file,vertexCount)
+            if(sys.byteorder=="big"):
+                values.byteswap()
+            setattr(self,name,values)
+
+class CafeTables():
+    def __init__(self,cafeList,version):
+        """
+        Instantiates the CafeTables class, which stores the shortest path tree to and from every cafe of a RoadGraph
+        :Input:
+            cafeList:
+                the cafe list of the RoadGraph, as a list of (cafe,waiting time) tuples
+            version:
+                the version of the RoadGraph that the trees come from
+        :Time complexity:
+            O(C) where C is the number of cafes
+        :Aux space complexity:
+            O(C) where C is the number of cafes
+        """
+        self.cafeList = list(cafeList)
+        self.version = version
+        self.cafes = list(dict.fromkeys([cafe for (cafe,waitTime) in cafeList])) # the distinct cafes
+        self.toCafe = {} # cafe to the PathTree of incoming edges from the cafe
+        self.fromCafe = {} # cafe to the PathTree of outgoing edges from the cafe
+
+class ContractionHierarchy():
+    def __init__(self,graph,witnessLimit=64):
+        """
+        Instantiates the ContractionHierarchy class, which contracts the vertexes of a graph one at a time from least to most important
+        when a vertex is contracted, a shortcut edge is added between each pair of its remaining neighbours
+        unless a witness path that avoids the vertex is at least as short, so that shortest paths are kept
+        every edge then goes upwards (to a later contracted vertex) from one of its ends, and the shortest path between any two vertexes
+        goes up from the start and down to the end, so it can be found by searching upwards from both ends
+        :Input:
+            graph:
+                a Graph
+            witnessLimit:
+                the maximum number of vertexes settled by each witness search (an extra shortcut is added if it runs out)
+        :Time complexity:
+            O(V(D^2 W log(W) + log(V))) where V is the number of vertexes, D is the largest number of neighbours
+            of a vertex when it is contracted and W is witnessLimit
+        :Aux space complexity:
+            O(V + E + S) where V is the number of vertexes, E is the number of edges and S is the number of shortcuts
+        """
+        (offsets,targets,weights) = graph.getCSR().adjacency()
+        self.vertexCount = len(graph)
+        self.witnessLimit = witnessLimit
+        self.version = graph.version
+        self.cafeList = [] # the cafes that cafeSearches was made for
+        self.cafeSearches = {} # cafe to the upward searches to and from the cafe
+        # the remaining graph, where out[u][v] and into[v][u] are the weight of the shortest edge from u to v
+        out = [{} for _ in range(self.vertexCount)]
+        into = [{} for _ in range(self.vertexCount)]
+        for u in range(self.vertexCount):
+            for i in range(offsets[u],offsets[u+1]):
+                v = targets[i]
+                if(v!=u and (v not in out[u] or weights[i]<out[u][v])):
+                    out[u][v] = weights[i]; into[v][u] = weights[i]
+        self.middle = {} # (u,v) to the vertex that the shortcut from u to v skips
+        self.rank = array("q",[0]) * self.vertexCount # the position of each vertex in the contraction order
+        upEdges = [[] for _ in range(self.vertexCount)] # u to the (v,w) of each edge from u to a higher ranked v
+        downEdges = [[] for _ in range(self.vertexCount)] # v to the (u,w) of each edge to v from a higher ranked u
+        contractedNeighbours = [0] * self.vertexCount
+        # contract the vertex with the lowest priority, updating priorities lazily
+        queue = [(self.priority(u,out,into,contractedNeighbours),u) for u in range(self.vertexCount)]
+        heapq.heapify(queue)
+        contracted = 0
+        while(len(queue)>0):
+            (priority,v) = heapq.heappop(queue)
+            newPriority = self.priority(v,out,into,contractedNeighbours)
+            if(len(queue)>0 and newPriority>queue[0][0]):
+                heapq.heappush(queue,(newPriority,v))
+                continue
+            self.rank[v] = contracted
+            contracted += 1
+            # every remaining edge of v goes to a higher ranked vertex
+            for (w,weight) in out[v].items():
+                upEdges[v].append((w,weight))
+                contractedNeighbours[w] += 1
+                del into[w][v]
+            for (u,weight) in into[v].items():
+                downEdges[v].append((u,weight))
+                contractedNeighbours[u] += 1
+                del out[u][v]
+            for (u,w,weight) in self.findShortcuts(v,out,into):
+                if(w not in out[u] or weight<out[u][w]):
+                    out[u][w] = weight; into[w][u] = weight
+                    self.middle[(u,w)] = v
+            out[v] = {}; into[v] = {}
+        # store the upward and downward edges in compressed sparse row form
+        (self.upOffsets,self.upTargets,self.upWeights) = self.packEdges(upEdges,graph.getCSR().weights.typecode)
+        (self.downOffsets,self.downTargets,self.downWeights) = self.packEdges(downEdges,graph.getCSR().weights.typecode)
+
+    def packEdges(self,edgeLists,typecode):
+        """
+        stores lists of edges in compressed sparse row form
+        :Input:
+            edgeLists:
+                a list where the uth item is a list of the (v,w) of each edge of u
+            typecode:
+                the typecode of the weights array
+        :Output, return or postcondition:
+            the offsets, targets and weights arrays
+        :Time complexity:
+            O(V + E) where V is the number of vertexes and E is the number of edges
+        :Aux space complexity:
+            O(V + E) where V is the number of vertexes and E is the number of edges
+        """
+        offsets = array("l",[0]) * (len(edgeLists) + 1)
+        targets = array("l")
+        weights = array(typecode)
+        for u in range(len(edgeLists)):
+            for (v,w) in edgeLists[u]:
+                targets.append(v); weights.append(w)
+            offsets[u+1] = len(targets)
+        return (offsets,targets,weights)
+
+    def findShortcuts(self,v,out,into):
+        """
+        finds the shortcuts needed to contract a vertex from the remaining graph
+        :Input:
+            v:
+                an integer representing the vertex
+            out:
+                the outgoing edges of the remaining graph
+            into:
+                the incoming edges of the remaining graph
+        :Output, return or postcondition:
+            a list of (u,w,weight) tuples, one for each shortcut from u to w
+        :Time complexity:
+            O(D^2 W log(W)) where D is the number of neighbours of v and W is witnessLimit
+        :Aux space complexity:
+            O(D^2 + W) where D is the number of neighbours of v and W is witnessLimit
+        """
+        shortcuts = []
+        if(len(out[v])==0):
+            return shortcuts
+        maxOut = max(out[v].values())
+        for (u,inWeight) in into[v].items():
+            if(u==v):
+                continue
+            witness = self.witnessSearch(u,v,inWeight + maxOut,out)
+            for (w,outWeight) in out[v].items():
+                if(w!=u and witness.get(w,float('inf'))>inWeight + outWeight):
+                    shortcuts.append((u,w,inWeight + outWeight))
+        return shortcuts
+
+    def witnessSearch(self,source,avoid,bound,out):
+        """
+        finds the distances from a source in the remaining graph without going through a vertex,
+        stopping once the distances are larger than bound or witnessLimit vertexes have been settled
+        :Input:
+            source:
+                an integer representing the source vertex
+            avoid:
+                an integer representing the vertex to avoid
+            bound:
+                the largest distance that is needed
+            out:
+                the outgoing edges of the remaining graph
+        :Output, return or postcondition:
+            a dictionary from each settled vertex to its distance
+        :Time complexity:
+            O(W D log(W D)) where D is the largest number of neighbours of a vertex and W is witnessLimit
+        :Aux space complexity:
+            O(W D) where D is the largest number of neighbours of a vertex and W is witnessLimit
+        """
+        settled = {}
+        queue = [(0,source)]
+        while(len(queue)>0 and len(settled)<self.witnessLimit):
+            (dist,u) = heapq.heappop(queue)
+            if(u in settled):
+                continue
+            if(dist>bound):
+                break
+            settled[u] = dist
+            for (w,weight) in out[u].items():
+                if(w!=avoid and w not in settled):
+                    heapq.heappush(queue,(dist + weight,w))
+        return settled
+
+    def priority(self,v,out,into,contractedNeighbours):
+        """
+        gets the priority of contracting a vertex, which is the number of shortcuts it needs minus the number of edges it removes,
+        plus the number of its neighbours that have been contracted (so that contractions are spread across the graph)
+        :Input:
+            v:
+                an integer representing the vertex
+            out:
+                the outgoing edges of the remaining graph
+            into:
+                the incoming edges of the remaining graph
+            contractedNeighbours:
+                a list of the number of contracted neighbours of each vertex
+        :Output, return or postcondition:
+            the priority, where vertexes with lower priorities are contracted first
+        :Time complexity:
+            the same as findShortcuts
+        :Aux space complexity:
+            the same as findShortcuts
+        """
+        return len(self.findShortcuts(v,out,into)) - len(out[v]) - len(into[v]) + contractedNeighbours[v]
+
+    def upwardSearch(self,source,useDown=False):
+        """
+        finds the distance from a source to every vertex that can be reached by only going to higher ranked vertexes
+        :Input:
+            source:
+                an integer representing the source vertex
+            useDown:
+                whether to follow edges backwards, which finds the distances to the source instead
+        :Output, return or postcondition:
+            a dictionary from each reached vertex to its distance, and a dictionary from each reached vertex to its previous vertex
+        :Time complexity:
+            O(E' log(E')) where E' is the number of upward edges from the reached vertexes
+        :Aux space complexity:
+            O(E') where E' is the number of upward edges from the reached vertexes
+        """
+        if(useDown):
+            (offsets,targets,weights) = (self.downOffsets,self.downTargets,self.downWeights)
+        else:
+            (offsets,targets,weights) = (self.upOffsets,self.upTargets,self.upWeights)
+        dist = {}
+        prev = {source:None}
+        best = {source:0}
+        queue = [(0,source)]
+        while(len(queue)>0):
+            (d,u) = heapq.heappop(queue)
+            if(u in dist):
+                continue
+            dist[u] = d
+            for i in range(offsets[u],offsets[u+1]):
+                v = targets[i]
+                if(v not in best or d + weights[i]<best[v]):
+                    best[v] = d + weights[i]
+                    prev[v] = u
+                    heapq.heappush(queue,(best[v],v))
+        for u in list(prev):
+            if(u not in dist):
+                del prev[u]
+        return (dist,prev)
+
+    def meet(self,forward,backward):
+        """
+        finds where a forward and a backward upward search meet on the shortest path
+        :Input:
+            forward:
+                the output of upwardSearch from the start
+            backward:
+                the output of upwardSearch from the end with useDown
+        :Output, return or postcondition:
+            the shortest distance from the start to the end, and the vertex where the searches meet (or None if there is no path)
+        :Time complexity:
+            O(min(A,B)) where A and B are the number of vertexes reached by each search
+        :Aux space complexity:
+            O(1)
+        """
+        (forwardDist,backwardDist) = (forward[0],backward[0])
+        if(len(backwardDist)<len(forwardDist)):
+            vertexes = backwardDist
+        else:
+            vertexes = forwardDist
+        minDist = float('inf'); meeting = None
+        for x in vertexes:
+            if(x in forwardDist and x in backwardDist and forwardDist[x] + backwardDist[x]<minDist):
+                minDist = forwardDist[x] + backwardDist[x]; meeting = x
+        return (minDist,meeting)
+
+    def unpack(self,u,v):
+        """
+        replaces an edge of the hierarchy with the edges of the original graph that it stands for
+        :Input:
+            u:
+                an integer representing the start of the edge
+            v:
+                an integer representing the end of the edge
+        :Output, return or postcondition:
+            a list of integers representing the path from u to v, not including u
+        :Time complexity:
+            O(P) where P is the number of vertexes in the path
+        :Aux space complexity:
+            O(P) where P is the number of vertexes in the path
+        """
+        path = []
+        stack = [(u,v)]
+        while(len(stack)>0):
+            (a,b) = stack.pop()
+            if((a,b) in self.middle):
+                # the first half of the shortcut is processed first
+                m = self.middle[(a,b)]
+                stack.append((m,b))
+                stack.append((a,m))
+            else:
+                path.append(b)
+        return path
+
+    def path(self,forward,backward,meeting):
+        """
+        gets the path of the original graph where a forward and a backward upward search meet
+        :Input:
+            forward:
+                the output of upwardSearch from the start
+            backward:
+                the output of upwardSearch from the end with useDown
+            meeting:
+                the vertex where the searches meet
+        :Output, return or postcondition:
+            a list of integers representing the path from the start to the end
+        :Time complexity:
+            O(P) where P is the number of vertexes in the path
+        :Aux space complexity:
+            O(P) where P is the number of vertexes in the path
+        """
+        # the upward edges from the start to the meeting vertex
+        upward = [meeting]
+        while(forward[1][upward[-1]]!=None):
+            upward.append(forward[1][upward[-1]])
+        upward.reverse()
+        # followed by the downward edges from the meeting vertex to the end
+        while(backward[1][upward[-1]]!=None):
+            upward.append(backward[1][upward[-1]])
+        path = [upward[0]]
+        for i in range(len(upward)-1):
+            path += self.unpack(upward[i],upward[i+1])
+        return path
+
+    def query(self,start,end):
+        """
+        finds the shortest path from the start to the end with a bidirectional upward search
+        :Input:
+            start:
+                an integer representing the starting vertex
+            end:
+                an integer representing the ending vertex
+        :Output, return or postcondition:
+            the distance, and a list of integers representing the path (or None if there is no path)
+        :Time complexity:
+            O(E' log(E') + P) where E' is the number of upward edges reached by both searches and P is the length of the path
+        :Aux space complexity:
+            O(E' + P) where E' is the number of upward edges reached by both searches and P is the length of the path
+        """
+        forward = self.upwardSearch(start)
+        backward = self.upwardSearch(end,useDown=True)
+        (dist,meeting) = self.meet(forward,backward)
+        if(meeting==None):
+            return (dist,None)
+        return (dist,self.path(forward,backward,meeting))
+
+    def searchCafes(self,cafeList):
+        """
+        stores the upward searches to and from every cafe, so that routing with a coffee only needs
+        an upward search from the start and from the end
+        :Input:
+            cafeList:
+                a list of tuples, containing the vertex of a cafe and its waiting time
+        :Output, return or postcondition:
+            cafeList and cafeSearches are replaced
+        :Time complexity:
+            O(C E' log(E')) where C is the number of cafes and E' is the number of upward edges reached from a cafe
+        :Aux space complexity:
+            O(C E') where C is the number of cafes and E' is the number of upward edges reached from a cafe
+        """
+        self.cafeList = list(cafeList)
+        self.cafeSearches = {}
+        for (cafe,waitTime) in self.cafeList:
+            if(cafe not in self.cafeSearches):
+                self.cafeSearches[cafe] = (self.upwardSearch(cafe,useDown=True),self.upwardSearch(cafe))
+
+# binary layout of a cafe tables file: header, the distinct cafes, then the 4 arrays of both trees of each cafe
+CAFE_TABLES_MAGIC = b"FIT2004C"
+CAFE_TABLES_VERSION = 1
+CAFE_TABLES_HEADER = struct.Struct("<8sIQQI32s") # magic, version, vertexes, edges, distinct cafes, fingerprint of the roads
+
+class TreeCache():
+    def __init__(self,memoryBudget):
+        """
+        Instantiates the TreeCache class, which keeps the most recently used PathTrees of a graph until their arrays
+        use more than memoryBudget bytes, and which is cleared whenever the graph changes
+        :Input:
+            memoryBudget:
+                the maximum number of bytes used by the arrays of the cached trees
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        self.memoryBudget = memoryBudget
+        self.trees = OrderedDict() # (source,useOpp) to PathTree, from least to most recently used
+        self.nbytes = 0
+        self.version = None # the version of the graph that the trees came from
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        """
+        gets the number of cached trees
+        :Output, return or postcondition:
+            the number of cached trees
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        return len(self.trees)
+
+    def get(self,key,version):
+        """
+        gets a cached tree and marks it as the most recently used
+        :Input:
+            key:
+                a tuple of (source,useOpp)
+            version:
+                the current version of the graph, where trees from other versions are discarded
+        :Output, return or postcondition:
+            the PathTree, or None if it isn't cached
+        :Time complexity:
+            O(1), or O(K) if the graph has changed where K is the number of cached trees
+        :Aux space complexity:
+            O(1)
+        """
+        with self.lock:
+            if(self.version!=version):
+                self.clear()
+                self.version = version
+            tree = self.trees.get(key)
+            if(tree==None):
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.trees.move_to_end(key)
+            return tree
+
+    def put(self,key,tree,version):
+        """
+        caches a tree, removing the least recently used trees until the memory budget is met
+        :Input:
+            key:
+                a tuple of (source,useOpp)
+            tree:
+                a PathTree
+            version:
+                the version of the graph that the tree came from
+        :Time complexity:
+            O(1) amortized
+        :Aux space complexity:
+            O(1)
+        """
+        with self.lock:
+            if(self.version!=version or tree.nbytes()>self.memoryBudget):
+                return
+            if(key in self.trees):
+                self.nbytes -= self.trees.pop(key).nbytes()
+            self.trees[key] = tree
+            self.nbytes += tree.nbytes()
+            while(self.nbytes>self.memoryBudget):
+                (oldKey,oldTree) = self.trees.popitem(last=False)
+                self.nbytes -= oldTree.nbytes()
+
+    def clear(self):
+        """
+        removes every cached tree
+        :Time complexity:
+            O(K) where K is the number of cached trees
+        :Aux space complexity:
+            O(1)
+        """
+        self.trees.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        """
+        gets statistics about the cache
+        :Output, return or postcondition:
+            a dictionary with the number of hits, misses, cached trees and bytes used
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        return {"hits":self.hits,"misses":self.misses,"trees":len(self.trees),"bytes":self.nbytes}
 
 class Vertex:
     def __init__(self,vertexId):
@@ -265,7 +947,6 @@ class Vertex:
         self.id = vertexId 
         self.edges = [] # outgoing edges
         self.oppEdges = [] # incoming edges
-        self.dataList = [] # record of data related to djikstra or topographical sort
 
 
 class Edge:
@@ -285,16 +966,143 @@ class Edge:
         self.v = v # end vertex
         self.w = w # weight
 
+def weightArray(weights=()):
+    """
+    creates an array for storing edge weights, which stores integers if every weight is an integer and floats otherwise
+    :Input:
+        weights:
+            the initial weights
+    :Output, return or postcondition:
+        an array of weights
+    :Time complexity:
+        O(E) where E is the number of weights
+    :Aux space complexity:
+        O(E) where E is the number of weights
+    """
+    try:
+        return array("q",weights)
+    except (TypeError,OverflowError):
+        return array("d",weights)
+
+class CSRGraph:
+    def __init__(self,vertexCount,edgeU,edgeV,edgeW,base=None):
+        """
+        Instantiates the CSRGraph class, which stores the outgoing and incoming edges of a graph in compressed sparse row form
+        the edges of vertex u are at the indexes from offsets[u] up to (but not including) offsets[u+1] of targets and weights,
+        in the same order that they were added to the graph
+        :Input:
+            vertexCount:
+                the number of vertexes
+            edgeU:
+                an array where the ith item is the start vertex of the ith edge
+            edgeV:
+                an array where the ith item is the end vertex of the ith edge
+            edgeW:
+                an array where the ith item is the weight of the ith edge
+            base:
+                a CSRGraph of the edges that were added before these edges, or None if there are none
+        :Time complexity:
+            O(V + E) where V is the number of vertexes and E is the number of edges
+        :Aux space complexity:
+            O(V + E) where V is the number of vertexes and E is the number of edges
+        """
+        self.vertexCount = vertexCount
+        # outgoing edges are grouped by start vertex, and incoming edges are grouped by end vertex
+        (self.offsets,self.targets,self.weights) = self.groupEdges(edgeU,edgeV,edgeW,
+            None if base==None else base.adjacency())
+        (self.oppOffsets,self.oppTargets,self.oppWeights) = self.groupEdges(edgeV,edgeU,edgeW,
+            None if base==None else base.adjacency(True))
+
+    def __len__(self):
+        """
+        gets the number of edges
+        :Output, return or postcondition:
+            the number of edges
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        return len(self.targets)
+
+    def groupEdges(self,sources,targets,weights,base=None):
+        """
+        groups edges by their source vertex using counting sort, which keeps the edges of each vertex in their original order
+        :Input:
+            sources:
+                an array of the vertex that each edge is grouped by
+            targets:
+                an array of the other vertex of each edge
+            weights:
+                an array of the weight of each edge
+            base:
+                the offsets, targets and weights arrays of edges that are already grouped, which go before the new edges
+                of each vertex, or None if there are none
+        :Output, return or postcondition:
+            the offsets, targets and weights arrays of the grouped edges
+        :Time complexity:
+            O(V + E) where V is the number of vertexes and E is the number of edges
+        :Aux space complexity:
+            O(V + E) where V is the number of vertexes and E is the number of edges
+        """
+        if(base==None):
+            base = (array("l",[0]) * (self.vertexCount + 1),array("l"),weightArray())
+        (baseOffsets,baseTargets,baseWeights) = base
+        typecode = "d" if "d" in [weights.typecode,baseWeights.typecode] else "q"
+        # count the edges of each vertex, then turn the counts into offsets
+        offsets = array("l",[0]) * (self.vertexCount + 1)
+        for u in range(self.vertexCount):
+            offsets[u+1] = baseOffsets[u+1] - baseOffsets[u]
+        for u in sources:
+            offsets[u+1] += 1
+        for u in range(self.vertexCount):
+            offsets[u+1] += offsets[u]
+        # place the grouped edges of each vertex first, then each new edge at the next free position of its vertex
+        position = array("l",offsets)
+        groupedTargets = array("l",[0]) * (len(baseTargets) + len(sources))
+        groupedWeights = array(typecode,[0]) * (len(baseTargets) + len(sources))
+        for u in range(self.vertexCount):
+            for i in range(baseOffsets[u],baseOffsets[u+1]):
+                groupedTargets[position[u]] = baseTargets[i]
+                groupedWeights[position[u]] = baseWeights[i]
+                position[u] += 1
+        for i in range(len(sources)):
+            u = sources[i]
+            groupedTargets[position[u]] = targets[i]
+            groupedWeights[position[u]] = weights[i]
+            position[u] += 1
+        return (offsets,groupedTargets,groupedWeights)
+
+    def adjacency(self,useOpp=False):
+        """
+        gets the arrays of either the outgoing or incoming edges
+        :Input:
+            useOpp:
+                whether to get incoming edges instead of outgoing edges
+        :Output, return or postcondition:
+            the offsets, targets and weights arrays
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        if(useOpp):
+            return (self.oppOffsets,self.oppTargets,self.oppWeights)
+        return (self.offsets,self.targets,self.weights)
+
 class Graph:
-    def __init__(self,vertexPairsWithWeight):
+    def __init__(self,vertexPairsWithWeight,compact=True):
         """
         Instantiates the Graph class
+        new edges are stored in arrays, which are moved into a CSRGraph when the graph is searched
         :Input:
             vertexPairsWithWeight:
                 a list of tuples with three items each:
                     an integer representing the start vertex
                     an integer representing the end vertex
                     the weight        
+            compact:
+                whether to only store the edges in arrays, or to also create Vertex and Edge objects
         :Time complexity:
             O(V + E) where V is the number of vertexes and E is the number of edges
         :Aux space complexity:
@@ -304,8 +1112,16 @@ class Graph:
         maxID = 0
         for (u,v,w) in vertexPairsWithWeight:
             maxID = max(u,v,maxID)
+        self.vertexCount = maxID + 1
+        self.edgeCount = 0
+        # the edges that haven't been moved into the CSRGraph yet
+        self.edgeU = array("l")
+        self.edgeV = array("l")
+        self.edgeW = weightArray()
+        self.csr = None # built by getCSR
+        self.version = 0 # incremented whenever the graph changes
         # instantiate vertexes
-        self.vertexes = [Vertex(i) for i in range(maxID+1)] 
+        self.vertexes = None if compact else [Vertex(i) for i in range(self.vertexCount)]
         # add edges
         self.addEdgesByIndex(vertexPairsWithWeight)
     def addEdgeByIndex(self,uIndex,vIndex,w=1):
@@ -316,17 +1132,29 @@ class Graph:
             v: an integer representing the ending vertex
             w: the weight of the edge
         :Time complexity:
-            O(1)
+            O(1) amortized
         :Aux space complexity:
             O(1)
         """
-        # get vertexes
-        u = self.vertexes[uIndex]; v = self.vertexes[vIndex]
-        # add edge
-        edge = Edge(u,v,w) 
-        u.edges.append(edge)
-        # add the inverse edge
-        v.oppEdges.append(Edge(v,u,w))
+        if(not (0<=uIndex<self.vertexCount and 0<=vIndex<self.vertexCount)):
+            raise IndexError("vertex index out of range")
+        self.edgeU.append(uIndex)
+        self.edgeV.append(vIndex)
+        try:
+            self.edgeW.append(w)
+        except (TypeError,OverflowError): # a float weight has been added, so store every weight as a float
+            self.edgeW = array("d",self.edgeW)
+            self.edgeW.append(w)
+        self.edgeCount += 1
+        self.version += 1
+        if(self.vertexes!=None):
+            # get vertexes
+            u = self.vertexes[uIndex]; v = self.vertexes[vIndex]
+            # add edge
+            edge = Edge(u,v,w) 
+            u.edges.append(edge)
+            # add the inverse edge
+            v.oppEdges.append(Edge(v,u,w))
 
     def addEdgesByIndex(self,indexPairWithWeightList):
         """
@@ -345,6 +1173,45 @@ class Graph:
         for (uIndex,vIndex,w) in indexPairWithWeightList:
             self.addEdgeByIndex(uIndex,vIndex,w)
 
+    def getCSR(self):
+        """
+        gets the edges grouped into a CSRGraph, which is rebuilt with the edges that have been added since it was last built
+        the added edges are then removed from the arrays, so each edge is only stored by the CSRGraph
+        :Output, return or postcondition:
+            a CSRGraph of the graph
+        :Time complexity:
+            O(1) if the CSRGraph is up to date, O(V + E) otherwise, where V is the number of vertexes and E is the number of edges
+        :Aux space complexity:
+            O(1) if the CSRGraph is up to date, O(V + E) otherwise, where V is the number of vertexes and E is the number of edges
+        """
+        if(self.csr==None or len(self.edgeU)>0):
+            self.csr = CSRGraph(self.vertexCount,self.edgeU,self.edgeV,self.edgeW,self.csr)
+            self.edgeU = array("l")
+            self.edgeV = array("l")
+            self.edgeW = weightArray()
+        return self.csr
+
+    def fingerprint(self):
+        """
+        gets a SHA-256 hash of the edges, which is the same for two graphs only if they have the same edges in the same order
+        :Output, return or postcondition:
+            the 32 byte hash
+        :Time complexity:
+            O(V + E) where V is the number of vertexes and E is the number of edges
+        :Aux space complexity:
+            O(V + E) where V is the number of vertexes and E is the number of edges
+        """
+        csr = self.getCSR()
+        digest = hashlib.sha256()
+        for values in [csr.offsets,csr.targets,csr.weights,csr.oppOffsets,csr.oppTargets,csr.oppWeights]:
+            # hash every array as little endian 64 bit values, so the hash doesn't depend on the platform
+            values = array("d" if values.typecode=="d" else "q",values)
+            if(sys.byteorder=="big"):
+                values.byteswap()
+            digest.update(values.typecode.encode("ascii"))
+            digest.update(values.tobytes())
+        return digest.digest()
+
     def __len__(self):
         """
         returns the number of vertexes in the graph
@@ -355,10 +1222,10 @@ class Graph:
         :Aux space complexity:
             O(1)
         """
-        return len(self.vertexes)
+        return self.vertexCount
 
 class RoadGraph(Graph):
-    def __init__(self,roads,cafes):
+    def __init__(self,roads,cafes,compact=True):
         """
         Instantiates the RoadGraph class, which is a subclass of Graph that also stores a list of cafes, along with a routing function
         :Input:
@@ -371,23 +1238,311 @@ class RoadGraph(Graph):
                 a list of tuples with two items each:
                     an integer representing a vertex with a cafe
                     the time taken to order a coffee at the cafe
+            compact:
+                whether to only store the roads in arrays, or to also create Vertex and Edge objects
 
         :Time complexity:
             O(V + E) where V is the number of vertexes and E is the number of edges
         :Aux space complexity:
             O(V + E) where V is the number of vertexes and E is the number of edges
         """
-        super().__init__(roads)
+        super().__init__(roads,compact)
         # get all vertexes that have cafes, and assign their associated waiting time
         self.cafeList = cafes
+        # the DjikStates used by routing, which each thread has its own copy of
+        self.localStates = threading.local()
+        self.treeCache = None # set by enableTreeCache
+        self.cafeTables = None # set by precomputeCafeTables or loadCafeTables
+        self.contractionHierarchy = None # set by buildContractionHierarchy
+    def __getstate__(self):
+        """
+        gets the attributes to pickle when the graph is sent to another process, which leaves out the DjikStates of each thread
+        and the cached trees (only the memory budget of the cache is kept)
+        :Output, return or postcondition:
+            a dictionary of attributes
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        state = self.__dict__.copy()
+        del state["localStates"]
+        state["treeCache"] = None if self.treeCache==None else self.treeCache.memoryBudget
+        return state
+
+    def __setstate__(self,state):
+        """
+        restores the attributes of an unpickled graph
+        :Input:
+            state:
+                a dictionary of attributes from __getstate__
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        self.__dict__.update(state)
+        self.localStates = threading.local()
+        if(self.treeCache!=None):
+            self.treeCache = TreeCache(self.treeCache)
+
+    def getDjikStates(self):
+        """
+        gets the forward and reverse DjikStates of the current thread, which are created the first time the thread uses them
+        :Output, return or postcondition:
+            a list of two DjikStates
+        :Time complexity:
+            O(1) if the thread has used them before, O(V) otherwise, where V is the number of vertexes
+        :Aux space complexity:
+            O(1) if the thread has used them before, O(V) otherwise, where V is the number of vertexes
+        """
+        states = getattr(self.localStates,"djikStates",None)
+        if(states==None):
+            states = [DjikState(len(self)),DjikState(len(self))]
+            self.localStates.djikStates = states
+        return states
+
+    def enableTreeCache(self,memoryBudget):
+        """
+        makes routing keep the most recently used shortest path trees, so that a start or end that has been used before
+        doesn't need another djikstra
+        :Input:
+            memoryBudget:
+                the maximum number of bytes used by the cached trees, where each tree uses about 16 bytes per vertex
+        :Output, return or postcondition:
+            the TreeCache, whose stats method gives the number of hits and misses
+        :Time complexity:
+            O(1)
+        :Aux space complexity:
+            O(1)
+        """
+        self.treeCache = TreeCache(memoryBudget)
+        return self.treeCache
+
+    def getTree(self,source,useOpp=False):
+        """
+        gets the shortest path tree from a source, either from the tree cache or from a new djikstra
+        :Input:
+            source:
+                an integer representing the source vertex
+            useOpp:
+                whether to use incoming edges instead of outgoing edges
+        :Output, return or postcondition:
+            a PathTree, or the DjikState of this thread if there is no tree cache (which is reused by the next search)
+        :Time complexity:
+            O(1) if the tree is cached, O(E log(V) + V) otherwise, where V is the number of vertexes and E is the number of edges
+        :Aux space complexity:
+            O(1) if the tree is cached, O(V) otherwise, where V is the number of vertexes
+        """
+        state = self.getDjikStates()[1 if useOpp else 0]
+        if(self.treeCache==None):
+            return self.djikstra(source,useOpp,state)
+        key = (source,useOpp)
+        version = self.version
+        tree = self.treeCache.get(key,version)
+        if(tree==None):
+            tree = PathTree(self.djikstra(source,useOpp,state))
+            self.treeCache.put(key,tree,version)
+        return tree
+
+    def precomputeCafeTables(self):
+        """
+        runs a djikstra from every cafe along outgoing edges and along incoming edges, and keeps the trees
+        so that routing only needs to compare the cafes, until the roads or cafes change
+        :Output, return or postcondition:
+            the CafeTables
+        :Time complexity:
+            O(C(E log(V) + V)) where V is the number of vertexes, E is the number of edges and C is the number of cafes
+        :Aux space complexity:
+            O(CV) where V is the number of vertexes and C is the number of cafes
+        """
+        tables = CafeTables(self.cafeList,self.version)
+        state = DjikState(len(self))
+        for cafe in tables.cafes:
+            tables.toCafe[cafe] = PathTree(self.djikstra(cafe,True,state))
+            tables.fromCafe[cafe] = PathTree(self.djikstra(cafe,False,state))
+        self.cafeTables = tables
+        return tables
+
+    def getCafeTables(self):
+        """
+        gets the cafe tables if they are up to date with the roads and cafes
+        :Output, return or postcondition:
+            the CafeTables, or None if there are none or they are out of date
+        :Time complexity:
+            O(C) where C is the number of cafes
+        :Aux space complexity:
+            O(1)
+        """
+        tables = self.cafeTables
+        if(tables==None or tables.version!=self.version or tables.cafeList!=list(self.cafeList)):
+            return None
+        return tables
+
+    def saveCafeTables(self,path):
+        """
+        writes the cafe tables to a binary file, which can be loaded by a RoadGraph with the same roads and cafes
+        :Input:
+            path:
+                the path of the file to write
+        :Time complexity:
+            O(CV + E) where V is the number of vertexes, E is the number of edges and C is the number of cafes
+        :Aux space complexity:
+            O(V + E) where V is the number of vertexes and E is the number of edges
+        """
+        tables = self.getCafeTables()
+        if(tables==None):
+            raise ValueError("the cafe tables haven't been computed for the current roads and cafes")
+        with open(path,"wb") as file:
+            file.write(CAFE_TABLES_HEADER.pack(CAFE_TABLES_MAGIC,CAFE_TABLES_VERSION,len(self),self.edgeCount,len(tables.cafes),
+                self.fingerprint()))
+            file.write(struct.pack("<%dq" % len(tables.cafes),*tables.cafes))
+            for cafe in tables.cafes:
+                tables.toCafe[cafe].writeTo(file)
+                tables.fromCafe[cafe].writeTo(file)
+
+    def loadCafeTables(self,path):
+        """
+        reads cafe tables written by saveCafeTables, which have to come from a graph with the same roads and cafes
+        :Input:
+            path:
+                the path of the file to read
+        :Output, return or postcondition:
+            the CafeTables
+        :Time complexity:
+            O(CV + E) where V is the number of vertexes, E is the number of edges and C is the number of cafes
+        :Aux space complexity:
+            O(CV + E) where V is the number of vertexes, E is the number of edges and C is the number of cafes
+        """
+        tables = CafeTables(self.cafeList,self.version)
+        with open(path,"rb") as file:
+            (magic,version,vertexCount,edgeCount,cafeCount,fingerprint) = CAFE_TABLES_HEADER.unpack(file.read(CAFE_TABLES_HEADER.size))
+            if(magic!=CAFE_TABLES_MAGIC or version!=CAFE_TABLES_VERSION):
+                raise ValueError("not a cafe tables file")
+            cafes = list(struct.unpack("<%dq" % cafeCount,file.read(8 * cafeCount)))
+            if(vertexCount!=len(self) or edgeCount!=self.edgeCount or cafes!=tables.cafes or fingerprint!=self.fingerprint()):
+                raise ValueError("the cafe tables are for a different graph")
+            for cafe in cafes:
+                for (trees,useOpp) in [(tables.toCafe,True),(tables.fromCafe,False)]:
+                    tree = PathTree(None,vertexCount)
+                    tree.source = cafe; tree.useOpp = useOpp
+                    tree.readFrom(file)
+                    trees[cafe] = tree
+        self.cafeTables = tables
+        return tables
+
+    def tableRouting(self,tables,start,end):
+        """
+        a function that calculates the quickest path to go from the start to end with a detour to purchase a coffee
+        using the trees to and from each cafe, so no djikstra is needed
+        :Input:
+            tables:
+                the up to date CafeTables of the graph
+            start:
+                an integer representing the starting vertex
+            end:
+                an integer representing the ending vertex
+        :Output, return or postcondition:
+            a list of integers representing the path taken, or None if there is no path
+        :Time complexity:
+            O(C + V) where V is the number of vertexes and C is the number of cafes
+        :Aux space complexity:
+            O(V) where V is the number of vertexes
+        """
+        # get the cafe that provides the quickest path, in the same way as routing
+        minCafe = None; minDist = float('inf')
+        for (cafe,waitTime) in self.cafeList:
+            dist = tables.toCafe[cafe].distOf(start) + waitTime + tables.fromCafe[cafe].distOf(end)
+            if(dist<minDist):
+                minCafe = cafe; minDist = dist 
+        if(minCafe==None): return None
+        # the tree to the cafe goes from the start towards the cafe, and the tree from the cafe goes from the end towards the cafe
+        startPath = [start] + self.backtrack(start,tables.toCafe[minCafe].prevOf)
+        endPath = self.backtrack(end,tables.fromCafe[minCafe].prevOf)
+        endPath.reverse()
+        # the cafe is the last vertex of startPath and the first vertex of endPath + [end]
+        return startPath + (endPath + [end])[1:]
+
+    def buildContractionHierarchy(self,witnessLimit=64):
+        """
+        builds a ContractionHierarchy of the roads, along with the upward searches to and from every cafe,
+        so that routing only needs an upward search from the start and from the end, until the roads or cafes change
+        :Input:
+            witnessLimit:
+                the maximum number of vertexes settled by each witness search
+        :Output, return or postcondition:
+            the ContractionHierarchy
+        :Time complexity:
+            the same as building the ContractionHierarchy, plus O(C E' log(E')) where C is the number of cafes
+            and E' is the number of upward edges reached from a cafe
+        :Aux space complexity:
+            the same as building the ContractionHierarchy, plus O(C E') where C is the number of cafes
+            and E' is the number of upward edges reached from a cafe
+        """
+        hierarchy = ContractionHierarchy(self,witnessLimit)
+        hierarchy.searchCafes(self.cafeList)
+        self.contractionHierarchy = hierarchy
+        return hierarchy
+
+    def getContractionHierarchy(self):
+        """
+        gets the contraction hierarchy if it is up to date with the roads and cafes
+        :Output, return or postcondition:
+            the ContractionHierarchy, or None if there is none or it is out of date
+        :Time complexity:
+            O(C) where C is the number of cafes
+        :Aux space complexity:
+            O(1)
+        """
+        hierarchy = self.contractionHierarchy
+        if(hierarchy==None or hierarchy.version!=self.version or hierarchy.cafeList!=list(self.cafeList)):
+            return None
+        return hierarchy
+
+    def hierarchyRouting(self,hierarchy,start,end):
+        """
+        a function that calculates the quickest path to go from the start to end with a detour to purchase a coffee
+        by meeting an upward search from the start and from the end with the upward searches of each cafe
+        :Input:
+            hierarchy:
+                the up to date ContractionHierarchy of the graph
+            start:
+                an integer representing the starting vertex
+            end:
+                an integer representing the ending vertex
+        :Output, return or postcondition:
+            a list of integers representing the path taken, or None if there is no path
+        :Time complexity:
+            O(E' log(E') + CA + P) where C is the number of cafes, E' is the number of upward edges reached from the start and end,
+            A is the number of vertexes reached by each upward search and P is the length of the path
+        :Aux space complexity:
+            O(E' + P) where E' is the number of upward edges reached from the start and end and P is the length of the path
+        """
+        forward = hierarchy.upwardSearch(start)
+        backward = hierarchy.upwardSearch(end,useDown=True)
+        # get the cafe that provides the quickest path, in the same way as routing
+        minCafe = None; minDist = float('inf'); minMeetings = None
+        for (cafe,waitTime) in self.cafeList:
+            (toCafe,fromCafe) = hierarchy.cafeSearches[cafe]
+            (startDist,startMeeting) = hierarchy.meet(forward,toCafe)
+            (endDist,endMeeting) = hierarchy.meet(fromCafe,backward)
+            dist = startDist + waitTime + endDist
+            if(dist<minDist):
+                minCafe = cafe; minDist = dist; minMeetings = (startMeeting,endMeeting)
+        if(minCafe==None): return None
+        (toCafe,fromCafe) = hierarchy.cafeSearches[minCafe]
+        startPath = hierarchy.path(forward,toCafe,minMeetings[0])
+        endPath = hierarchy.path(fromCafe,backward,minMeetings[1])
+        return startPath + endPath[1:]
+
     def backtrack(self,startVertex,getPrev):
         """
         a function that backtracks from a particular vertex until the source point
         :Input:
             startVertex:
-                the vertex to backtrack from
+                an integer representing the vertex to backtrack from
             getPrev:
-                a function to obtain the previous vertex from the vertex
+                a function to obtain the previous vertex from the vertex, or None if there is none
         :Output, return or postcondition:
             a list of integers representing the path from the start vertex to the source vertex
         :Time complexity:
@@ -399,12 +1554,15 @@ class RoadGraph(Graph):
         u = startVertex
         while(getPrev(u)!=None): # loop until there is no previous vertex anymore
             u = getPrev(u) # get previous vertex
-            path.append(u.id)
+            path.append(u)
         return path
 
     def routing(self,start,end):
         """
         a function that calculates the quickest path to go from the start to end with a detour to purchase a coffee
+        the cafe tables are used if they are up to date, otherwise the contraction hierarchy is used if it is up to date,
+        otherwise a djikstra is done from the start and from the end. every engine finds the quickest path,
+        but when there are equally quick paths, each engine can return a different one
         :Input:
             start:
                 an integer representing the starting vertex
@@ -413,102 +1571,360 @@ class RoadGraph(Graph):
         :Output, return or postcondition:
             a list of integers representing the path taken
         :Time complexity:
-            O(E log(V) + V) where V is the number of vertexes and E is the number of edges
+            O(E log(V) + V) where V is the number of vertexes and E is the number of edges,
+            or O(C + V) if the cafe tables are up to date or the trees from start and end are in the tree cache,
+            where C is the number of cafes (see hierarchyRouting for the contraction hierarchy)
         :Aux space complexity:
-            O(E log(V) + V) where V is the number of vertexes and E is the number of edges
+            O(1) if the current thread has routed before and the tree cache isn't used, O(V) otherwise,
+            where V is the number of vertexes
         """
         # if there are no vertices or there are no cafes, return None
         if(len(self)==0 or len(self.cafeList)==0): return None
-        # do djikstra from start and from end
-        self.djikstra(start) # resulting data from each vertex can be accessed with u.dataList[-2]
-        self.djikstra(end,useOpp=True) # resulting data from each vertex can be accessed with u.dataList[-1]
+        # use the cafe tables if they are up to date
+        tables = self.getCafeTables()
+        if(tables!=None):
+            return self.tableRouting(tables,start,end)
+        # otherwise use the contraction hierarchy if it is up to date
+        hierarchy = self.getContractionHierarchy()
+        if(hierarchy!=None):
+            return self.hierarchyRouting(hierarchy,start,end)
+        # do djikstra from start and from end (or get their trees from the tree cache)
+        forward = self.getTree(start)
+        reverse = self.getTree(end,useOpp=True)
 
         # get the cafe that provides the quickest path
         minCafe = None; minDist = float('inf')
-        for (cafeIndex,waitTime) in self.cafeList:
-            # get cafe vertex
-            cafe = self.vertexes[cafeIndex]
+        for (cafe,waitTime) in self.cafeList:
             # start to cafe + cafe wait time + cafe to end
-            dist = cafe.dataList[-2].dist + waitTime + cafe.dataList[-1].dist
+            dist = forward.distOf(cafe) + waitTime + reverse.distOf(cafe)
             # update variables if the discovered path is better
             if(dist<minDist):
                 minCafe = cafe; minDist = dist 
         # if there is no valid cafe, return None
         if(minCafe==None): return None
         # get the path from the cafe to the start point
-        startPath = self.backtrack(minCafe,lambda u: u.dataList[-2].prev)
+        startPath = self.backtrack(minCafe,forward.prevOf)
         # get the path from the cafe to the end point
-        endPath = self.backtrack(minCafe,lambda u: u.dataList[-1].prev)
+        endPath = self.backtrack(minCafe,reverse.prevOf)
         # reverse start path so that it goes from start to cafe
         startPath.reverse()
         # concatenate paths (including the cafe itself)
-        path = startPath + [minCafe.id] + endPath
+        path = startPath + [minCafe] + endPath
         # return in the form of a list of integers
         return path
 
-    def relax(self,edge):
+    def layeredRouting(self,start,end):
         """
-        finds if an edge can be used to provide a shorter path to a particular vertex
+        a function that calculates the quickest path to go from the start to end with a detour to purchase a coffee,
+        using a single search over two layers of the graph, where layer 0 is before buying a coffee and layer 1 is after
+        each vertex u is state u in layer 0 and state V + u in layer 1, and each cafe has an edge from layer 0 to layer 1
+        weighted by its waiting time, so the search stops as soon as the end has been reached in layer 1
+        states are labelled with (time,cafe rank), so the cafe chosen is the earliest quickest cafe in cafeList like in routing
+        the layered search only picks the cafe: its predecessors break ties between equally quick paths differently to routing
+        (the part after the cafe is searched from the cafe rather than backwards from the end), so the path to and from the cafe
+        is found with the same djikstras as routing, stopped as soon as the cafe is reached so that only the vertexes closer than
+        the cafe are settled
+        the output is the same as routing when the times add up exactly (eg integer times). with other float times, the layered
+        search adds the times in a different order to routing, so a tie between two equally quick cafes (or paths) can be
+        broken differently because of rounding, although both paths are the quickest up to rounding
         :Input:
-            edge: the edge that is being checked
+            start:
+                an integer representing the starting vertex
+            end:
+                an integer representing the ending vertex
         :Output, return or postcondition:
-            a boolean representing if the edge was relaxed
+            a list of integers representing the path taken, or None if there is no path
         :Time complexity:
-            O(log(V)) where V is the number of vertexes
+            O(E' log(V) + V) where V is the number of vertexes and E' is the number of edges from the states
+            that are closer to the start than the end in layer 1 (at most 2E + V)
         :Aux space complexity:
-            O(1)
+            O(V) where V is the number of vertexes
+        """
+        # if there are no vertices or there are no cafes, return None
+        if(len(self)==0 or len(self.cafeList)==0): return None
+        (offsets,targets,weights) = self.getCSR().adjacency()
+        vertexCount = len(self)
+        # get the waiting time of each cafe and its rank, which is the position of the cafe in cafeList that routing would use
+        cafeWait = {}; cafeRank = {}
+        for i in range(len(self.cafeList)):
+            (cafe,waitTime) = self.cafeList[i]
+            if(cafe not in cafeWait or waitTime<cafeWait[cafe]):
+                cafeWait[cafe] = waitTime; cafeRank[cafe] = i
+        # only the states that have been discovered are stored
+        label = {start:(0,0)} # (time from the start, rank of the cafe used)
+        heapIndex = {}
+        def setHeapIndex(x,val): # function for setting the heap index, passed as an argument into MinHeap, O(1) time and aux space complexity
+            heapIndex[x] = val
+        minHeap = MinHeap(2*vertexCount,lambda x: label[x],lambda x: heapIndex[x],setHeapIndex)
+        minHeap.append(start)
+        target = vertexCount + end
+        reached = False
+        while(minHeap.notEmpty()):
+            x = minHeap.serve()
+            # the end has been reached after buying a coffee
+            if(x==target):
+                reached = True
+                break
+            (dist,rank) = label[x]
+            u = x - vertexCount if x>=vertexCount else x
+            layerStart = x - u
+            # the edges of the vertex within its layer, and the edge to layer 1 if the vertex has a cafe
+            nextStates = [(layerStart + targets[i],(dist + weights[i],rank)) for i in range(offsets[u],offsets[u+1])]
+            if(layerStart==0 and u in cafeWait):
+                nextStates.append((vertexCount + u,(dist + cafeWait[u],cafeRank[u])))
+            for (y,newLabel) in nextStates:
+                if(y not in label):
+                    label[y] = newLabel
+                    minHeap.append(y)
+                elif(newLabel<label[y]):
+                    label[y] = newLabel
+                    minHeap.update(y)
+        # if the end can't be reached after buying a coffee, return None
+        if(not reached): return None
+        cafe = self.cafeList[label[target][1]][0]
+        # find the paths to and from the cafe in the same way as routing
+        (forward,reverse) = self.getDjikStates()
+        self.djikstra(start,state=forward,stopAt=cafe)
+        self.djikstra(end,useOpp=True,state=reverse,stopAt=cafe)
+        startPath = self.backtrack(cafe,forward.prevOf)
+        startPath.reverse()
+        return startPath + [cafe] + self.backtrack(cafe,reverse.prevOf)
+
+    def endTable(self,end):
+        """
+        finds the distance from every cafe to the end, along with the path from every cafe that can reach the end
+        :Input:
+            end:
+                an integer representing the ending vertex
+        :Output, return or postcondition:
+            a list of the distance from each cafe in cafeList to the end,
+            and a dictionary from each cafe that can reach the end to the path after the cafe
+        :Time complexity:
+            O(E log(V) + CV) where V is the number of vertexes, E is the number of edges and C is the number of cafes
+        :Aux space complexity:
+            O(CV) where V is the number of vertexes and C is the number of cafes
         """
-        # current distance of v > distance of u + weight of u to v?
-        if(edge.v.dataList[-1].dist>edge.u.dataList[-1].dist+edge.w):
-            # if so set the edge accordingly
-            edge.v.dataList[-1].dist = edge.u.dataList[-1].dist + edge.w
-            edge.v.dataList[-1].prev = edge.u 
-            return True 
-        return False
-            
-    def djikstra(self,startVertexIndex,useOpp=False):
+        reverse = self.getTree(end,useOpp=True)
+        cafeDist = [reverse.distOf(cafe) for (cafe,waitTime) in self.cafeList]
+        endPaths = {}
+        for (cafe,waitTime) in self.cafeList:
+            if(reverse.isDiscovered(cafe) and cafe not in endPaths):
+                endPaths[cafe] = self.backtrack(cafe,reverse.prevOf)
+        return (cafeDist,endPaths)
+
+    def startRoutes(self,start,endTables):
+        """
+        finds the quickest path with a detour to purchase a coffee from the start to each of many ends,
+        using a single djikstra from the start
+        :Input:
+            start:
+                an integer representing the starting vertex
+            endTables:
+                a list of the output of endTable for each end
+        :Output, return or postcondition:
+            a list of the path to each end (the same as routing), or None if there is no path
+        :Time complexity:
+            O(E log(V) + V + TC + TV) where V is the number of vertexes, E is the number of edges,
+            C is the number of cafes and T is the number of ends
+        :Aux space complexity:
+            O(TV) where V is the number of vertexes and T is the number of ends
+        """
+        forward = self.getTree(start)
+        paths = []
+        startPaths = {} # the path from the start to each cafe that has been used
+        for (cafeDist,endPaths) in endTables:
+            # get the cafe that provides the quickest path, in the same way as routing
+            minCafe = None; minDist = float('inf')
+            for i in range(len(self.cafeList)):
+                (cafe,waitTime) = self.cafeList[i]
+                dist = forward.distOf(cafe) + waitTime + cafeDist[i]
+                if(dist<minDist):
+                    minCafe = cafe; minDist = dist 
+            if(minCafe==None):
+                paths.append(None)
+                continue
+            if(minCafe not in startPaths):
+                startPath = self.backtrack(minCafe,forward.prevOf)
+                startPath.reverse()
+                startPaths[minCafe] = startPath
+            paths.append(startPaths[minCafe] + [minCafe] + endPaths[minCafe])
+        return paths
+
+    def routingMany(self,pairs,workers=1,useProcesses=False):
+        """
+        a function that answers routing for many (start,end) pairs, where queries with the same start share a djikstra
+        from the start and queries with the same end share a djikstra from the end
+        the djikstras are run by a pool of threads, or a pool of processes that each receive a copy of the graph
+        (which should be compact, since Vertex objects make the copy much larger)
+        if the cafe tables or the contraction hierarchy are up to date, each pair is answered by routing instead,
+        so that the output is always the same as routing
+        :Input:
+            pairs:
+                a list of tuples with two items each:
+                    an integer representing the starting vertex
+                    an integer representing the ending vertex
+            workers:
+                the number of threads or processes to use
+            useProcesses:
+                whether to use processes instead of threads
+        :Output, return or postcondition:
+            a list of the output of routing for each pair, in the same order as pairs
+        :Time complexity:
+            O((S + T)(E log(V) + V) + P(C + V)) where V is the number of vertexes, E is the number of edges, C is the number of cafes,
+            S and T are the number of distinct starts and ends, and P is the number of pairs
+        :Aux space complexity:
+            O(TCV + PV) where V is the number of vertexes, C is the number of cafes, T is the number of distinct ends
+            and P is the number of pairs
+        """
+        # if there are no vertices or there are no cafes, every output is None
+        if(len(self)==0 or len(self.cafeList)==0): return [None] * len(pairs)
+        # the cafe tables and the contraction hierarchy answer each pair quickly on their own, and routing uses them before djikstra
+        if(self.getCafeTables()!=None or self.getContractionHierarchy()!=None):
+            return [self.routing(start,end) for (start,end) in pairs]
+        # group the ends of each start, keeping the order they first appear in
+        ends = {}
+        startEnds = {}
+        for (start,end) in pairs:
+            ends.setdefault(end,len(ends))
+            startEnds.setdefault(start,{}).setdefault(end,None)
+        if(workers<=1):
+            mapper = map
+            pool = None
+            graph = self
+        elif(useProcesses):
+            pool = multiprocessing.Pool(workers,initRoutingWorker,(self,))
+            mapper = pool.map
+            graph = None # each process uses its own copy of the graph
+        else:
+            pool = ThreadPoolExecutor(workers)
+            mapper = pool.map
+            graph = self
+        try:
+            # one djikstra from each end
+            endTables = list(mapper(endTableJob,[(graph,end) for end in ends]))
+            # one djikstra from each start, for all of its ends
+            jobs = [(graph,start,[endTables[ends[end]] for end in startEnds[start]]) for start in startEnds]
+            for (start,paths) in zip(startEnds,mapper(startRoutesJob,jobs)):
+                for (end,path) in zip(startEnds[start],paths):
+                    startEnds[start][end] = path
+        finally:
+            if(useProcesses and pool!=None):
+                pool.close()
+                pool.join()
+            elif(pool!=None):
+                pool.shutdown()
+        # output in the same order as pairs (repeated pairs get their own copy of the path)
+        output = []
+        for (start,end) in pairs:
+            path = startEnds[start][end]
+            output.append(None if path==None else list(path))
+        return output
+
+    def djikstra(self,startVertexIndex,useOpp=False,state=None,stopAt=None):
         """
         finds the distance from one vertex to every other vertex in a weighted directed graph
+        the graph isn't modified, so searches with different states can run at the same time
         :Input:
             startVertexIndex:
                 the starting vertex from which the distance to every other vertex should be calculated
             useOpp:
                 whether to use incoming edges instead of outgoing edges 
+            state:
+                a DjikState to reuse for the search, or None to create a new one
+            stopAt:
+                a vertex after which the search stops, or None to search the whole graph
+                (the vertexes that have been served, including stopAt, have the same data as when the whole graph is searched)
+        :Output, return or postcondition:
+            the DjikState holding the distance and previous vertex of each vertex
         :Time complexity:
             O(E log(V) + V) where V is the number of vertexes and E is the number of edges
         :Aux space complexity:
-            O(E + V) where V is the number of vertexes and E is the number of edges
+            O(1) if a state is given, O(V) otherwise, where V is the number of vertexes
         """
-        # create empty DjikData instances for storing djikstra related information
-        for u in self.vertexes:
-            u.dataList.append(DjikData())
+        (offsets,targets,weights) = self.getCSR().adjacency(useOpp)
+        if(state==None):
+            state = DjikState(len(self))
+        state.reset(startVertexIndex,useOpp)
+        dist = state.dist; prev = state.prev; minHeap = state.heap
         # set starting vertex to zero
-        self.vertexes[startVertexIndex].dataList[-1].dist = 0
-        self.vertexes[startVertexIndex].dataList[-1].discovered = True
-        # create a min heap and input starting vertex 
-        def setHeapIndex(u,val): # function for setting the heap index, passed as an argument into MinHeap, O(1) time and aux space complexity
-            u.dataList[-1].heapIndex = val
-        minHeap = MinHeap(len(self),lambda u: u.dataList[-1].dist,lambda u: u.dataList[-1].heapIndex,setHeapIndex)
-        minHeap.append(self.vertexes[startVertexIndex])
+        state.discover(startVertexIndex)
+        dist[startVertexIndex] = 0
+        # input starting vertex into the min heap
+        minHeap.append(startVertexIndex)
         # loop until empty
         while(minHeap.notEmpty()):
             # get vertex
             u = minHeap.serve()
+            if(u==stopAt):
+                break
             # loop through adjacent edges (either using normal edges or opposite edges)
-            adjacent = u.oppEdges if useOpp else u.edges
-            for edge in adjacent:
-                v = edge.v
+            for i in range(offsets[u],offsets[u+1]):
+                v = targets[i]
                 # add to queue if not visited 
-                if(not v.dataList[-1].discovered):
-                    v.dataList[-1].discovered = True # set as discovered
+                if(not state.isDiscovered(v)):
+                    state.discover(v) # set as discovered
                     minHeap.append(v)
-                # relax edge
-                updated = self.relax(edge)
-                # if the vertex distance was modified, update
-                if(updated):
-                    minHeap.update(edge.v)
+                # relax edge, and if the vertex distance was modified, update
+                if(dist[v]>dist[u]+weights[i]):
+                    dist[v] = dist[u] + weights[i]
+                    prev[v] = u
+                    minHeap.update(v)
+        return state
+
 
 
+# the graph used by the jobs of a process started by routingMany
+routingWorkerGraph = None
+
+def initRoutingWorker(graph):
+    """
+    stores the graph for the jobs of a process started by routingMany
+    :Input:
+        graph:
+            a RoadGraph
+    :Time complexity:
+        O(1)
+    :Aux space complexity:
+        O(1)
+    """
+    global routingWorkerGraph
+    routingWorkerGraph = graph
+
+def endTableJob(job):
+    """
+    runs RoadGraph.endTable for routingMany
+    :Input:
+        job:
+            a tuple of (graph,end), where graph is None if the graph of the process should be used
+    :Output, return or postcondition:
+        the output of endTable
+    :Time complexity:
+        the same as RoadGraph.endTable
+    :Aux space complexity:
+        the same as RoadGraph.endTable
+    """
+    (graph,end) = job
+    if(graph==None):
+        graph = routingWorkerGraph
+    return graph.endTable(end)
+
+def startRoutesJob(job):
+    """
+    runs RoadGraph.startRoutes for routingMany
+    :Input:
+        job:
+            a tuple of (graph,start,endTables), where graph is None if the graph of the process should be used
+    :Output, return or postcondition:
+        the output of startRoutes
+    :Time complexity:
+        the same as RoadGraph.startRoutes
+    :Aux space complexity:
+        the same as RoadGraph.startRoutes
+    """
+    (graph,start,endTables) = job
+    if(graph==None):
+        graph = routingWorkerGraph
+    return graph.startRoutes(start,endTables)
 
 class SkiGraph(Graph):
     """
@@ -520,60 +1936,56 @@ class SkiGraph(Graph):
     def partialTopologicalSort(self,start,finish):
         """
         sorts part of a directed acyclic graph such that the path from start to finish will be included
+        the visited vertexes are stored in a list that only exists during the sort, so the graph is not modified
+        vertexes are processed depth first, and each vertex is added to the order after all of its neighbours have been processed
         :Input:
             start:
                 an integer representing the starting vertex
             finish:
                 an integer representing the finishing vertex
         :Output, return or postcondition:
-            the topological order of some of the vertexes with start and finish included
+            the topological order of some of the vertexes with start and finish included, as a list of integers
         :Time complexity:
             O(E + V)  where V is the number of vertexes and E is the number of edges
         :Aux space complexity:
             O(V)  where V is the number of vertexes
         """
-        # add storage for topographical sort into vertexes
-        for u in self.vertexes:
-            u.dataList.append(TopoData())
-        # process from starting position
+        (offsets,targets,weights) = self.getCSR().adjacency()
+        visited = [False] * len(self) # has this vertex been visited?
         order = []
-        self.processNeighbours(order,self.vertexes[start],finish)
+        # process from starting position, where each stack item is a vertex and the index of the next edge to check
+        stack = []
+        visited[start] = True
+        if(start==finish):
+            order.append(start)
+        else:
+            stack.append([start,offsets[start]])
+        while(len(stack)>0):
+            top = stack[-1]
+            u = top[0]
+            if(top[1]<offsets[u+1]):
+                # if the next adjacent vertex hasn't been visited yet, process it
+                v = targets[top[1]]
+                top[1] += 1
+                if(not visited[v]):
+                    visited[v] = True
+                    # if the finishing vertex is reached, there isn't a need to check subsequent vertexes
+                    if(v==finish):
+                        order.append(v)
+                    else:
+                        stack.append([v,offsets[v]])
+            else:
+                # after all child vertexes have been visited, add to order
+                stack.pop()
+                order.append(u)
         # reverse so that the starting vertex is first
         order.reverse()
         return order
-    def processNeighbours(self,order,u,finish):
-        """
-        function that recursively processes the neighbours of a vertex, and adding it to a list afterwards
-        :Input:
-            order:
-                an array storing the topological order
-            u:
-                the vertex to process
-            finish:
-                an integer. if the vertex corresponds to it, the recrusion should terminate early
-        :Time complexity:
-            O(E + V)  where V is the number of vertexes and E is the number of edges
-        :Aux space complexity:
-            O(V)  where V is the number of vertexes
-        """
-        # this vertex has been visited
-        u.dataList[-1].visited = True 
-        # if the finishing vertex is reached, there isn't a need to check subsequent vertexes
-        if(u.id==finish):
-            order.append(u)
-            return 
-        # loop through adjacent vertexes
-        for edge in u.edges:
-            # if this vertex hasn't been visited yet, process it
-            v = edge.v 
-            if(not v.dataList[-1].visited):
-                self.processNeighbours(order,v,finish)
-        # after all child vertexes have been visited, add to order
-        order.append(u)
 
     def routing(self,start,finish):
         """
         Finds the path from the start to the finish that provides the highest score
+        the graph isn't modified, so multiple routes can be found at the same time
         :Input:
             start:
                 integer that corresponds to a vertex in the graph
@@ -588,19 +2000,23 @@ class SkiGraph(Graph):
         """
         # get the order to loop through
         order = self.partialTopologicalSort(start,finish)
+        (offsets,targets,weights) = self.getCSR().adjacency()
+        score = [-float('inf')] * len(self) # score when going from the start to here
+        prev = [None] * len(self)
         # start at start where score = 0
-        self.vertexes[start].dataList[-1].score = 0
+        score[start] = 0
         # for each vertex in order loop through their adjacencies
         for u in order:
-            for edge in u.edges:
+            for i in range(offsets[u],offsets[u+1]):
                 # calculate the score at v if the current edge is used
-                v = edge.v 
-                newScore = edge.w + u.dataList[-1].score
+                v = targets[i]
+                newScore = weights[i] + score[u]
                 # is this better than the existing score? (or is this the first time this vertex is reached?)
-                if(newScore>v.dataList[-1].score):
+                if(newScore>score[v]):
                     # update accordingly
-                    v.dataList[-1].score = newScore
-                    v.dataList[-1].prev = u
+                    score[v] = newScore
+                    prev[v] = u
+        return (score,prev)
         
 def optimalRoute(downhillScores,start,finish):
     """
@@ -621,18 +2037,18 @@ def optimalRoute(downhillScores,start,finish):
     # instantiate graph
     g = SkiGraph(downhillScores)
     # calculate route
-    g.routing(start,finish)
+    (score,prev) = g.routing(start,finish)
     # find path
     path = []
-    previous = g.vertexes[finish] 
-    while(not previous in [g.vertexes[start],None]): # loop until the start vertex has been found
-        path.append(previous.id)
-        previous = g.vertexes[previous.id].dataList[-1].prev # get previous vertex
+    previous = finish
+    while(not previous in [start,None]): # loop until the start vertex has been found
+        path.append(previous)
+        previous = prev[previous] # get previous vertex
     # no valid path to start? then return None
     if(previous==None): return None 
 
     # add the starting vertex itself
-    path.append(previous.id) 
+    path.append(previous) 
     # make it so that the path starts at start
     path.reverse() 
-    return path
\ No newline at end of file
+    return path